@@ -38,6 +38,20 @@ def _get_changelog_version() -> str:
         return next(filter(bool, map(changelog_version_re.match, file))).group(1)  # ty: ignore[invalid-argument-type]
 
 
+@duty
+def bench(ctx: Context, *cli_args: str) -> None:
+    """Benchmark the extension on synthetic packages.
+
+    Parameters:
+        *cli_args: Additional arguments passed to the benchmark script (see `python scripts/benchmark.py -h`).
+    """
+    ctx.run(
+        [sys.executable, "scripts/benchmark.py", *cli_args],
+        title="Running benchmarks",
+        capture=False,
+    )
+
+
 @duty
 def changelog(ctx: Context, bump: str = "") -> None:
     """Update the changelog in-place with latest commits.
@@ -0,0 +1,171 @@
+# Benchmark the extension on synthetic packages.
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from itertools import count
+from time import perf_counter
+
+from griffe import Extensions, temporary_inspected_package, temporary_visited_package
+
+from griffe_pydantic import PydanticExtension
+
+_package_ids = count()
+
+
+def generate_model(
+    name: str,
+    base: str,
+    fields: int,
+    validator_density: float,
+    annotated_density: float,
+) -> str:
+    """Generate the source of a Pydantic model.
+
+    The first fields use `Annotated[..., Field(...)]`, according to the given density,
+    and the remaining ones alternate between plain defaults and `Field(...)` defaults.
+    The first fields get a validator, according to the given density.
+    """
+    lines = [f"class {name}({base}):", f'    """Docstring of {name}."""', ""]
+    annotated = round(fields * annotated_density)
+    for index in range(fields):
+        field = f"{name.lower()}_field_{index}"
+        if index < annotated:
+            lines.append(f'    {field}: Annotated[int, Field(ge=0, description="Field {index}.")] = {index}')
+        elif index % 2:
+            lines.append(f'    {field}: int = Field({index}, ge=0, le=1000, description="Field {index}.")')
+        else:
+            lines.append(f"    {field}: int = {index}")
+            lines.append(f'    """Field {index}."""')
+    for index in range(round(fields * validator_density)):
+        field = f"{name.lower()}_field_{index}"
+        lines.extend(
+            (
+                "",
+                f'    @field_validator("{field}")',
+                "    @classmethod",
+                f"    def check_{field}(cls, value: int) -> int:",
+                "        return value",
+            ),
+        )
+    return "\n".join(lines)
+
+
+def generate_package(
+    modules: int,
+    models: int,
+    fields: int,
+    *,
+    depth: int = 1,
+    validator_density: float = 0.2,
+    annotated_density: float = 0.3,
+) -> dict[str, str]:
+    """Generate the sources of a package with `modules` modules declaring `models` models each.
+
+    Models inherit from each other in chains of `depth` models (a depth of 1 means
+    all models directly inherit from `BaseModel`), and each model declares `fields` fields.
+    """
+    sources = {"__init__.py": '"""Synthetic package."""'}
+    header = "from typing import Annotated\n\nfrom pydantic import BaseModel, Field, field_validator\n\n"
+    for module_index in range(modules):
+        classes = []
+        for model_index in range(models):
+            name = f"Model{module_index}x{model_index}"
+            base = "BaseModel" if model_index % depth == 0 else f"Model{module_index}x{model_index - 1}"
+            classes.append(generate_model(name, base, fields, validator_density, annotated_density))
+        sources[f"module{module_index}.py"] = header + "\n\n\n".join(classes) + "\n"
+    return sources
+
+
+def run(sources: dict[str, str], mode: str, *, schema: bool, trace_memory: bool = False) -> tuple[float, int, int]:
+    """Load a package with the extension, and return the elapsed time, the peak memory and the number of models.
+
+    When schemas are enabled, they are all read, to measure their (lazy) generation.
+    Tracing memory allocations slows them down, so the peak memory is only measured (otherwise zero)
+    when `trace_memory` is enabled, and the elapsed time should then be ignored.
+    """
+    loader = temporary_visited_package if mode == "static" else temporary_inspected_package
+    extension = PydanticExtension(schema=schema)
+    # Use a different package name each time, since dynamic analysis imports the package.
+    package_name = f"griffe_pydantic_bench_{next(_package_ids)}"
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    start = perf_counter()
+    with loader(
+        package_name,
+        modules=sources,
+        extensions=Extensions(extension),
+        search_sys_path=mode == "dynamic",
+    ) as package:
+        if schema:
+            for module in package.modules.values():
+                for cls in module.classes.values():
+                    cls.extra["griffe_pydantic"]["schema"]()
+        elapsed = perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak, extension.stats.models
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmark", description="Benchmark the extension on synthetic packages.")
+    parser.add_argument("--modules", type=int, default=20, help="Number of modules. Default: %(default)s.")
+    parser.add_argument("--models", type=int, default=10, help="Number of models per module. Default: %(default)s.")
+    parser.add_argument("--fields", type=int, default=10, help="Number of fields per model. Default: %(default)s.")
+    parser.add_argument("--depth", type=int, default=3, help="Length of inheritance chains. Default: %(default)s.")
+    parser.add_argument(
+        "--validator-density",
+        type=float,
+        default=0.2,
+        help="Proportion of fields having a validator. Default: %(default)s.",
+    )
+    parser.add_argument(
+        "--annotated-density",
+        type=float,
+        default=0.3,
+        help="Proportion of fields declared with Annotated. Default: %(default)s.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("static", "dynamic"),
+        action="append",
+        help="Analysis mode to benchmark, can be repeated. Default: both.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of timed runs, the best is kept. Peak memory is measured in one more run. Default: %(default)s.",
+    )
+    opts = parser.parse_args(args)
+
+    sources = generate_package(
+        opts.modules,
+        opts.models,
+        opts.fields,
+        depth=max(1, opts.depth),
+        validator_density=opts.validator_density,
+        annotated_density=opts.annotated_density,
+    )
+    print(
+        f"{opts.modules} modules x {opts.models} models x {opts.fields} fields, depth {opts.depth}, "
+        f"validator density {opts.validator_density}, annotated density {opts.annotated_density}",
+    )
+    print(f"{'mode':<8} {'schema':<7} {'models':>7} {'time (s)':>9} {'peak (MiB)':>11}")
+    for mode in opts.mode or ("static", "dynamic"):
+        for schema in (False, True):
+            # Time and memory are measured in separate runs, since tracing allocations slows the extension down.
+            elapsed = min(run(sources, mode, schema=schema)[0] for _ in range(max(1, opts.repeat)))
+            _, peak, models = run(sources, mode, schema=schema, trace_memory=True)
+            print(f"{mode:<8} {'yes' if schema else 'no':<7} {models:>7} {elapsed:>9.3f} {peak / 1024 / 1024:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,13 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from griffe_pydantic._internal.cli import get_parser, main
+from griffe_pydantic._internal.common import ValidatorGraph
 from griffe_pydantic._internal.extension import PydanticExtension
+from griffe_pydantic._internal.index import ModelIndex
+from griffe_pydantic._internal.metadata import dump_metadata, load_metadata
+from griffe_pydantic._internal.records import iter_model_records, write_model_records
+from griffe_pydantic._internal.stats import ExtensionStats
 
 
 def get_templates_path() -> Path:
@@ -15,4 +21,16 @@ def get_templates_path() -> Path:
     return Path(__file__).parent / "templates"
 
 
-__all__: list[str] = ["PydanticExtension", "get_templates_path"]
+__all__: list[str] = [
+    "ExtensionStats",
+    "ModelIndex",
+    "PydanticExtension",
+    "ValidatorGraph",
+    "dump_metadata",
+    "get_parser",
+    "get_templates_path",
+    "iter_model_records",
+    "load_metadata",
+    "main",
+    "write_model_records",
+]
@@ -0,0 +1,529 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from contextlib import suppress
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+from griffe import AliasResolutionError, CyclicAliasError, Expr, ExprName, get_logger
+
+from griffe_pydantic._internal import common, serialization
+from griffe_pydantic._internal.debug import _get_version
+from griffe_pydantic._internal.index import _annotation_paths
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from griffe import Class, Module
+
+
+_logger = get_logger("griffe_pydantic")
+
+
+# Hashes of source files, keyed by file path, along with the modification time and size they were computed for.
+_file_hashes: dict[Path, tuple[int, int, str]] = {}
+
+# Analysis results kept in memory across loads (incremental mode), keyed by module path.
+_memory_entries: dict[str, dict] = {}
+
+
+class _MemoryStore:
+    """Strings kept in memory up to a total size, evicting least recently used ones first.
+
+    Fragments can be rendered from several threads, so entries are only accessed under a lock.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self.size = 0
+        """The total size of the entries, in bytes."""
+
+    def get(self, key: str) -> str | None:
+        """Return an entry, marking it as recently used.
+
+        Parameters:
+            key: The key of the entry.
+
+        Returns:
+            The entry, or none.
+        """
+        with self._lock:
+            if (value := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, max_size: int) -> None:
+        """Store an entry, then evict least recently used entries until the store fits its maximum size.
+
+        Parameters:
+            key: The key of the entry.
+            value: The entry.
+            max_size: The maximum size of the store, in bytes.
+        """
+        size = len(value.encode())
+        with self._lock:
+            if (previous := self._entries.pop(key, None)) is not None:
+                self.size -= len(previous.encode())
+            self._entries[key] = value
+            self.size += size
+            while self.size > max_size and self._entries:
+                self.size -= len(self._entries.popitem(last=False)[1].encode())
+
+
+# Rendered fragments kept in memory across loads, when not cached on disk, keyed by fragment key.
+_memory_fragments = _MemoryStore()
+
+
+def _file_hash(filepath: Path) -> str | None:
+    """Hash the contents of a file, reusing the previous hash if the file was not modified.
+
+    Parameters:
+        filepath: The file path.
+
+    Returns:
+        A hash, or none if the file cannot be read.
+    """
+    try:
+        stat = filepath.stat()
+        if (entry := _file_hashes.get(filepath)) and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return entry[2]
+        file_hash = hashlib.sha256(filepath.read_bytes()).hexdigest()
+    except OSError:
+        return None
+    _file_hashes[filepath] = (stat.st_mtime_ns, stat.st_size, file_hash)
+    return file_hash
+
+
+def _write_atomically(filepath: Path, contents: str) -> None:
+    """Write a file through a temporary file, so that concurrent readers never see partial contents.
+
+    Parameters:
+        filepath: The file path.
+        contents: The contents to write.
+
+    Raises:
+        OSError: When the file cannot be written.
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary_name = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
+    temporary_path = Path(temporary_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf8") as file:
+            file.write(contents)
+        temporary_path.replace(filepath)
+    except BaseException:
+        with suppress(OSError):
+            temporary_path.unlink()
+        raise
+
+
+class _AnalysisCache:
+    """Cache of the static analysis of modules.
+
+    Each module gets its own entry, storing the Pydantic metadata
+    of the models it declares. Entries are keyed by a hash of the extension version,
+    of the base classes of models (see the `model_bases` option), of the module source,
+    and of the sources of the modules declaring the ancestors of its classes
+    (since the analysis of a model depends on its bases).
+
+    Entries are stored as JSON files on disk, and/or kept in memory
+    for subsequent loads in the same process (incremental mode).
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        memory: bool = False,
+        bases: Iterable[str] = (),
+    ) -> None:
+        """Initialize the cache.
+
+        Parameters:
+            directory: The directory in which to store analysis results.
+            memory: Whether to keep analysis results in memory, for subsequent loads in the same process.
+            bases: The paths of the base classes of Pydantic models.
+        """
+        self.directory = Path(directory) / "analysis" if directory is not None else None
+        """The directory in which analysis results are stored."""
+        self.memory = memory
+        """Whether analysis results are kept in memory."""
+        self._bases = "\n".join(sorted(bases))
+        self._source_hashes: dict[str, str | None] = {}
+
+    def _source_hash(self, mod: Module) -> str | None:
+        if mod.path not in self._source_hashes:
+            filepath = mod.filepath
+            self._source_hashes[mod.path] = _file_hash(filepath) if isinstance(filepath, Path) else None
+        return self._source_hashes[mod.path]
+
+    def _dependencies(self, obj: Module | Class, dependencies: set[str]) -> None:
+        for cls in obj.classes.values():
+            if cls.is_alias:
+                continue
+            try:
+                mro = cls.mro()
+            except ValueError:
+                continue
+            dependencies.update(parent.module.path for parent in mro)
+            self._dependencies(cls, dependencies)
+
+    def key(self, mod: Module) -> str | None:
+        """Compute the cache key of a module.
+
+        Parameters:
+            mod: A Griffe module.
+
+        Returns:
+            A cache key, or none if the module sources cannot be read.
+        """
+        if (source_hash := self._source_hash(mod)) is None:
+            return None
+        dependencies: set[str] = set()
+        self._dependencies(mod, dependencies)
+        dependencies.discard(mod.path)
+        hasher = hashlib.sha256(f"{_get_version()}\n{self._bases}\n{mod.path}\n{source_hash}\n".encode())
+        collection = mod.modules_collection
+        for dependency in sorted(dependencies):
+            dependency_hash = self._source_hash(collection[dependency])
+            if dependency_hash is None:
+                return None
+            hasher.update(f"{dependency}:{dependency_hash}\n".encode())
+        return hasher.hexdigest()
+
+    def _read(self, mod: Module) -> dict | None:
+        if self.memory and (entry := _memory_entries.get(mod.path)):
+            return entry
+        if self.directory is None:
+            return None
+        try:
+            with self.directory.joinpath(f"{mod.path}.json").open(encoding="utf8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, mod: Module, key: str) -> list | None:
+        """Apply cached analysis results onto a module's objects.
+
+        Parameters:
+            mod: A Griffe module.
+            key: The module's cache key.
+
+        Returns:
+            The updated Griffe objects, or none if there was no usable cache entry.
+        """
+        entry = self._read(mod)
+        if entry is None or entry.get("key") != key:
+            return None
+        try:
+            objects = serialization._load_objects(mod, entry["objects"])
+        except Exception as exc:  # noqa: BLE001
+            _logger.debug(f"Could not apply cached analysis of module {mod.path}: {exc}")
+            return None
+        if self.memory:
+            _memory_entries[mod.path] = entry
+        return objects
+
+    def store(self, mod: Module, key: str) -> None:
+        """Store analysis results of a module.
+
+        Parameters:
+            mod: A Griffe module.
+            key: The module's cache key.
+        """
+        entry = {"key": key, "objects": serialization._dump_module(mod)}
+        if self.memory:
+            _memory_entries[mod.path] = entry
+        if self.directory is None:
+            return
+        try:
+            _write_atomically(self.directory / f"{mod.path}.json", json.dumps(entry))
+        except OSError as exc:
+            _logger.debug(f"Could not store analysis of module {mod.path}: {exc}")
+
+
+def _schema_dependencies(cls: Class) -> list[Class]:
+    """Return the classes a model's JSON schema depends on.
+
+    These are the model itself, its ancestors, and the classes referenced
+    in the annotations of their attributes (nested models), recursively.
+    Classes that are not loaded (like Pydantic's own) are not returned.
+
+    Parameters:
+        cls: The Griffe class representing the Pydantic model.
+
+    Returns:
+        Griffe classes, sorted by path.
+    """
+    collection = cls.modules_collection
+    seen: dict[str, Class] = {}
+    stack = [cls]
+    while stack:
+        current = stack.pop()
+        if current.path in seen:
+            continue
+        seen[current.path] = current
+        with suppress(ValueError):
+            stack.extend(current.mro())
+        for member in current.members.values():
+            if member.is_alias or not member.is_attribute or not isinstance(member.annotation, Expr):
+                continue
+            for name in member.annotation.iterate(flat=True):
+                if not isinstance(name, ExprName):
+                    continue
+                try:
+                    target = collection[name.canonical_path]
+                    if target.is_alias:
+                        target = target.final_target
+                except (KeyError, ValueError, AliasResolutionError, CyclicAliasError):
+                    continue
+                if target.is_class:
+                    stack.append(target)
+    return [seen[path] for path in sorted(seen)]
+
+
+def _schema_key(cls: Class, pydantic_version: str) -> str | None:
+    """Compute the key of a model's schema, which changes whenever its schema can change.
+
+    The key covers the model's canonical path, the sources of the classes its schema depends on,
+    and the Pydantic version.
+
+    Parameters:
+        cls: The Griffe class representing the Pydantic model.
+        pydantic_version: The installed Pydantic version.
+
+    Returns:
+        A key, or none if sources are not available.
+    """
+    hasher = hashlib.sha256(f"{pydantic_version}\n{cls.canonical_path}\n".encode())
+    for dependency in _schema_dependencies(cls):
+        if not (source := dependency.source):
+            return None
+        hasher.update(f"{dependency.path}\n{source}\n".encode())
+    return hasher.hexdigest()
+
+
+class _SchemaCache:
+    """On-disk, size-bounded cache of JSON schemas.
+
+    Entries are keyed by a hash of the model's canonical path, of the sources
+    of the classes its schema depends on, and of the installed Pydantic version.
+    Least recently used entries are evicted as soon as the cache grows above its maximum size,
+    including when schemas are written lazily, after static analysis.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int) -> None:
+        """Initialize the cache.
+
+        Parameters:
+            directory: The directory in which to store schemas.
+            max_size: The maximum size of the cache, in bytes.
+        """
+        self.directory = Path(directory) / "schemas"
+        """The directory in which schemas are stored."""
+        self.max_size = max_size
+        """The maximum size of the cache, in bytes."""
+        self._pydantic_version = _get_version("pydantic")
+        # Size of the cache on disk, measured on first write, then tracked.
+        self._size: int | None = None
+        self._lock = Lock()
+
+    def key(self, cls: Class) -> str | None:
+        """Compute the cache key of a model's schema.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+
+        Returns:
+            A cache key, or none if sources are not available.
+        """
+        return _schema_key(cls, self._pydantic_version)
+
+    def get(self, key: str) -> str | None:
+        """Return a cached schema.
+
+        Parameters:
+            key: The schema's cache key.
+
+        Returns:
+            The schema as compact JSON, or none if it isn't cached.
+        """
+        filepath = self.directory / f"{key}.json"
+        try:
+            schema = filepath.read_text(encoding="utf8")
+            # Mark the entry as recently used.
+            os.utime(filepath)
+        except OSError:
+            return None
+        return schema
+
+    def set(self, key: str, schema: str) -> None:
+        """Cache a schema.
+
+        Parameters:
+            key: The schema's cache key.
+            schema: The schema as compact JSON.
+        """
+        try:
+            _write_atomically(self.directory / f"{key}.json", schema)
+        except OSError as exc:
+            _logger.debug(f"Could not cache schema: {exc}")
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = _prune(self.directory, self.max_size)
+            else:
+                self._size += len(schema.encode())
+                if self._size > self.max_size:
+                    self._size = _prune(self.directory, self.max_size)
+
+    def prune(self) -> None:
+        """Evict least recently used entries until the cache fits its maximum size."""
+        with self._lock:
+            self._size = _prune(self.directory, self.max_size)
+
+
+def _prune(directory: Path, max_size: int) -> int:
+    """Delete least recently used files in a directory until it fits a maximum size.
+
+    Parameters:
+        directory: The directory.
+        max_size: The maximum size of the directory, in bytes.
+
+    Returns:
+        The size of the directory after pruning, in bytes.
+    """
+    try:
+        entries = [(entry.stat(), entry) for entry in directory.iterdir()]
+    except OSError:
+        return 0
+    size = sum(stat.st_size for stat, _ in entries)
+    for stat, entry in sorted(entries, key=lambda item: item[0].st_mtime_ns):
+        if size <= max_size:
+            break
+        try:
+            entry.unlink()
+        except OSError:
+            continue
+        size -= stat.st_size
+    return size
+
+
+def _fingerprint(cls: Class, pydantic_version: str) -> str:
+    """Return a fingerprint of the contents rendered for a model, computed once and stored on the class.
+
+    The fingerprint covers the model's config, fields (with the canonical paths of the names
+    used in their annotations, which are rendered as links), validators and schema.
+    The schema is covered by its key, so that it is not generated when fragments are cached,
+    unless the sources it depends on are not available.
+
+    Parameters:
+        cls: The Griffe class representing the Pydantic model.
+        pydantic_version: The installed Pydantic version.
+
+    Returns:
+        A fingerprint.
+    """
+    extra = cls.extra[common._self_namespace]
+    if (fingerprint := extra.get("fingerprint")) is not None:
+        return fingerprint
+    data: dict[str, Any] = {
+        "path": cls.path,
+        "class": serialization._dump_class(cls),
+        "fields": [
+            [name, field.path, serialization._dump_attribute(field), list(_annotation_paths(field.annotation))]
+            for name, field in extra["fields"]().items()
+        ],
+        "validators": [
+            [name, validator.path, serialization._dump_function(validator)]
+            for name, validator in extra["validators"]().items()
+        ],
+    }
+    if (schema := extra.get("schema")) is not None:
+        if (key := _schema_key(cls, pydantic_version)) is not None:
+            data["schema_key"] = key
+        else:
+            data["schema"] = schema.compact()
+        data["schema_export"] = extra.get("schema_url") is not None
+    fingerprint = extra["fingerprint"] = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    return fingerprint
+
+
+class _FragmentCache:
+    """Cache of rendered HTML fragments of models, on disk (size-bounded) or in memory (across loads).
+
+    Entries are keyed by the fingerprint of the model, the name of the fragment,
+    the handler options the fragment is rendered with,
+    and the version of griffe-pydantic (which provides the templates).
+    """
+
+    def __init__(self, directory: str | Path | None, max_size: int) -> None:
+        """Initialize the cache.
+
+        Parameters:
+            directory: The directory in which to store fragments. If none, fragments are kept in memory.
+            max_size: The maximum size of the cache, on disk or in memory, in bytes.
+        """
+        self.directory = Path(directory) / "fragments" if directory is not None else None
+        """The directory in which fragments are stored."""
+        self.max_size = max_size
+        """The maximum size of the cache, on disk or in memory, in bytes."""
+        self._version = _get_version()
+        self._pydantic_version = _get_version("pydantic")
+
+    def _get(self, key: str) -> str | None:
+        if self.directory is None:
+            return _memory_fragments.get(key)
+        filepath = self.directory / f"{key}.html"
+        try:
+            html = filepath.read_text(encoding="utf8")
+            # Mark the entry as recently used.
+            os.utime(filepath)
+        except OSError:
+            return None
+        return html
+
+    def _set(self, key: str, html: str) -> None:
+        if self.directory is None:
+            _memory_fragments.set(key, html, self.max_size)
+            return
+        try:
+            _write_atomically(self.directory / f"{key}.html", html)
+        except OSError as exc:
+            _logger.debug(f"Could not cache fragment: {exc}")
+
+    def render(self, cls: Class, name: str, options: Any, render: Callable[[], str]) -> str:
+        """Return a cached fragment, or render and cache it.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+            name: The name of the fragment.
+            options: The handler options the fragment is rendered with (the `config` of templates).
+            render: A function rendering the fragment.
+
+        Returns:
+            The fragment, as safe HTML.
+        """
+        from markupsafe import Markup  # noqa: PLC0415
+
+        # Linking to an exported schema writes its file, which must exist even when the fragment is cached.
+        if name == "schema" and cls.extra[common._self_namespace].get("schema_url") is not None:
+            return render()
+        fingerprint = _fingerprint(cls, self._pydantic_version)
+        key = hashlib.sha256(f"{self._version}\n{name}\n{options!r}\n{fingerprint}".encode()).hexdigest()
+        if (html := self._get(key)) is not None:
+            return Markup(html)  # noqa: S704
+        html = render()
+        self._set(key, str(html))
+        return html
+
+    def prune(self) -> None:
+        """Evict least recently used entries until the cache fits its maximum size on disk."""
+        if self.directory is not None:
+            _prune(self.directory, self.max_size)
@@ -0,0 +1,244 @@
+# Why does this file exist, and why not put this in `__main__`?
+#
+# You might be tempted to import things from `__main__` later,
+# but that will cause problems: the code will get executed twice:
+#
+# - When you run `python -m griffe_pydantic` python will execute
+#   `__main__.py` as a script. That means there won't be any
+#   `griffe_pydantic.__main__` in `sys.modules`.
+# - When you import `__main__` it will get executed again (as a module) because
+#   there's no `griffe_pydantic.__main__` in `sys.modules`.
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from griffe import Extensions, GriffeLoader
+
+from griffe_pydantic._internal import common, debug, serialization, static
+from griffe_pydantic._internal.cache import _schema_key, _SchemaCache, _write_atomically
+from griffe_pydantic._internal.extension import PydanticExtension
+from griffe_pydantic._internal.records import _model_record, write_model_records
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from griffe import Class
+
+
+class _DebugInfo(argparse.Action):
+    def __init__(self, nargs: int | str | None = 0, **kwargs: Any) -> None:
+        super().__init__(nargs=nargs, **kwargs)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ARG002
+        debug._print_debug_info()
+        sys.exit(0)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return the CLI argument parser.
+
+    Returns:
+        An argparse parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="griffe-pydantic",
+        description="Export the fields, validators, config and JSON schema of the Pydantic models of packages, "
+        "as one JSON file per model.",
+    )
+    parser.add_argument("packages", metavar="PACKAGE", nargs="+", help="Packages to load.")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        required=True,
+        help="Directory in which to write JSON files, or file in which to write JSON Lines (`-` for standard output).",
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Stream all records as JSON Lines to the output file, instead of writing one file per model.",
+    )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=("static", "dynamic"),
+        default="static",
+        help="Whether to analyze sources (static) or imported modules (dynamic). Default: %(default)s.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of worker processes generating schemas. Default: %(default)s (serial generation).",
+    )
+    parser.add_argument(
+        "-s",
+        "--search",
+        dest="search_paths",
+        action="append",
+        type=Path,
+        default=[],
+        help="Paths to search packages into, before `sys.path`. Can be repeated.",
+    )
+    parser.add_argument(
+        "-c",
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory in which to cache analysis results and schemas across runs. Default: no caching.",
+    )
+    parser.add_argument(
+        "--progress",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Whether to show progress on standard error. Default: only when it is a terminal.",
+    )
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {debug._get_version()}")
+    parser.add_argument("--debug-info", action=_DebugInfo, help="Print debug information.")
+    return parser
+
+
+def _show_progress(step: str, index: int, total: int, name: str) -> None:
+    print(f"\r{step} [{index}/{total}] {name}\033[K", end="", file=sys.stderr)
+
+
+def _read_manifest(filepath: Path, header: dict[str, str]) -> dict[str, dict[str, str]]:
+    try:
+        manifest = json.loads(filepath.read_text(encoding="utf8"))
+    except (OSError, ValueError):
+        return {}
+    # Everything is exported again when the mode or the version of griffe-pydantic change.
+    if any(manifest.get(key) != value for key, value in header.items()):
+        return {}
+    return manifest.get("models", {})
+
+
+def _prune_cache(cache_dir: Path | None, extension: PydanticExtension) -> None:
+    # Schemas are written lazily while exporting, so the cache is pruned once everything is exported.
+    if cache_dir is not None:
+        _SchemaCache(cache_dir, extension._schema_cache_max_size).prune()
+
+
+def _stream_records(models: list[Class], *, progress: bool) -> Iterator[dict[str, Any]]:
+    for index, model in enumerate(models, 1):
+        if progress:
+            _show_progress("Exporting", index, len(models), model.path)
+        yield _model_record(model)
+
+
+def main(args: list[str] | None = None) -> int:
+    """Run the main program.
+
+    Models whose sources (and the sources of their ancestors and nested models)
+    did not change since the previous run are not exported again.
+
+    Parameters:
+        args: Arguments passed from the command line.
+
+    Returns:
+        An exit code.
+    """
+    parser = get_parser()
+    opts = parser.parse_args(args=args)
+    progress = sys.stderr.isatty() if opts.progress is None else opts.progress
+
+    extension = PydanticExtension(schema=True, cache_dir=opts.cache_dir, schema_workers=opts.workers)
+    loader = GriffeLoader(
+        extensions=Extensions(extension),
+        search_paths=[*opts.search_paths, *sys.path],
+        force_inspection=opts.mode == "dynamic",
+    )
+    packages = []
+    for index, package in enumerate(opts.packages, 1):
+        if progress:
+            _show_progress("Loading", index, len(opts.packages), package)
+        try:
+            packages.append(loader.load(package))
+        except ImportError as exc:
+            if progress:
+                print(file=sys.stderr)
+            print(f"griffe-pydantic: could not load package {package}: {exc}", file=sys.stderr)
+            return 1
+    if progress:
+        print(file=sys.stderr)
+
+    models = [
+        model
+        for package in packages
+        for mod in static._iter_modules(package)  # ty: ignore[invalid-argument-type]
+        for model in serialization._iter_models(mod)
+    ]
+
+    if opts.jsonl:
+        records = _stream_records(models, progress=progress)
+        if str(opts.output) == "-":
+            write_model_records(records, sys.stdout)
+        else:
+            with opts.output.open("w", encoding="utf8") as file:
+                write_model_records(records, file)
+        if progress and models:
+            print(file=sys.stderr)
+        _prune_cache(opts.cache_dir, extension)
+        return 0
+
+    output: Path = opts.output
+    manifest_path = output / "manifest.json"
+    header = {"mode": opts.mode, "version": debug._get_version()}
+    previous = _read_manifest(manifest_path, header)
+    # A model is unchanged when the key of its schema is: it covers the sources of the model,
+    # of its ancestors and of its nested models, as well as the version of Pydantic.
+    pydantic_version = debug._get_version("pydantic")
+    current: dict[str, dict[str, str]] = {}
+    changed = []
+    for model in models:
+        key = _schema_key(model, pydantic_version)
+        entry = {"key": key or "", "file": f"{model.path}.json"}
+        if key is None or previous.get(model.path) != entry or not output.joinpath(entry["file"]).exists():
+            changed.append((model, entry))
+        else:
+            current[model.path] = entry
+
+    # Schemas are generated lazily: generate them first, to show progress.
+    for index, (model, _) in enumerate(changed, 1):
+        if progress:
+            _show_progress("Generating schemas", index, len(changed), model.path)
+        if (schema := model.extra[common._self_namespace].get("schema")) is not None:
+            schema.compact()
+    failed = 0
+    for index, (model, entry) in enumerate(changed, 1):
+        if progress:
+            _show_progress("Exporting", index, len(changed), model.path)
+        record = _model_record(model)
+        try:
+            _write_atomically(output / entry["file"], json.dumps(record, indent=2))
+        except OSError as exc:
+            print(f"griffe-pydantic: could not export model {model.path}: {exc}", file=sys.stderr)
+            failed += 1
+            continue
+        # Models whose schema could not be generated are exported again on the next run.
+        if record["schema"] is None:
+            failed += 1
+        else:
+            current[model.path] = entry
+    if progress and changed:
+        print(file=sys.stderr)
+
+    removed = 0
+    paths = {model.path for model in models}
+    for path, entry in previous.items():
+        if path not in paths:
+            output.joinpath(entry["file"]).unlink(missing_ok=True)
+            removed += 1
+    _write_atomically(manifest_path, json.dumps({**header, "models": current}, indent=2))
+    _prune_cache(opts.cache_dir, extension)
+    print(
+        f"{len(changed)} models exported, {len(models) - len(changed)} unchanged, {removed} removed, "
+        f"{failed} incomplete",
+    )
+    return 0
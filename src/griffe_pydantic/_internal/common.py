@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import json
-from functools import partial
-from typing import TYPE_CHECKING
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any
+
+from griffe import AliasResolutionError, CyclicAliasError
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Callable, Iterator, Sequence
 
-    from griffe import Attribute, Class, Function
+    from griffe import Alias, Attribute, Class, Function, Object
     from pydantic import BaseModel
 
 _self_namespace = "griffe_pydantic"
@@ -28,24 +35,239 @@ _field_constraints = {
 }
 
 
-def _model_fields(cls: Class) -> dict[str, Attribute]:
-    return {name: attr for name, attr in cls.all_members.items() if "pydantic-field" in attr.labels}  # ty: ignore[invalid-return-type]
+def _object_path(obj: Object | Alias) -> str:
+    """Return the path identifying an object, shared by aliases and their target.
+
+    Parameters:
+        obj: A Griffe object or alias.
+
+    Returns:
+        The canonical path of the object, or the path of the alias when it cannot be resolved.
+    """
+    if obj.is_alias:
+        with suppress(AliasResolutionError, CyclicAliasError):
+            return obj.final_target.path
+    return obj.path
+
+
+def _labels(member: Object | Alias) -> set[str]:
+    """Return the labels of a member, or no labels when it is an alias that cannot be resolved.
+
+    Inspected models can have members (like the `__hash__` function of frozen models)
+    that are aliases to objects that cannot be loaded.
+
+    Parameters:
+        member: A Griffe object or alias.
+
+    Returns:
+        The labels.
+    """
+    try:
+        return member.labels
+    except (AliasResolutionError, CyclicAliasError):
+        return set()
+
+
+class _MembersIndex:
+    """Ordered index of the members of a model (inherited ones included) having a given label.
+
+    Call the instance to get the members, as a dictionary.
+    The index is built on first call, and rebuilt only after indexes were invalidated,
+    which the extension does whenever its hooks add members or change labels.
+    Code changing members or labels afterwards must invalidate indexes too.
+    """
+
+    _version = 0
+
+    def __init__(self, cls: Class, label: str) -> None:
+        """Initialize the index.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+            label: The label of the indexed members.
+        """
+        self._cls = cls
+        self._label = label
+        self._built_version = -1
+        self._members: dict[str, Attribute | Function] = {}
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Invalidate all indexes, so that they are rebuilt on next call."""
+        cls._version += 1
+
+    def __call__(self) -> dict[str, Attribute | Function]:
+        if self._built_version != _MembersIndex._version:
+            self._members = {
+                name: member  # ty: ignore[invalid-assignment]
+                for name, member in self._cls.all_members.items()
+                if self._label in _labels(member)
+            }
+            self._built_version = _MembersIndex._version
+        return self._members
+
+
+class ValidatorGraph:
+    """Relationships between the validators and the fields of a Pydantic model.
+
+    The graph is built in a single pass over the model's members (inherited ones included),
+    and can then be queried in both directions: fields targeted by a validator,
+    and validators targeting a field.
+
+    Graphs are available in the `validator_graph` entry
+    of the models' `griffe_pydantic` extra data.
+    """
+
+    def __init__(self, cls: Class) -> None:
+        """Build the graph.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+        """
+        self.model = cls
+        """The Griffe class representing the Pydantic model."""
+        self.fields: dict[str, Attribute] = {}
+        """The fields of the model, by name."""
+        self.validators: dict[str, Function] = {}
+        """The validators of the model, by name."""
+        for name, member in cls.all_members.items():
+            labels = _labels(member)
+            if "pydantic-field" in labels:
+                self.fields[name] = member  # ty: ignore[invalid-assignment]
+            elif "pydantic-validator" in labels:
+                self.validators[name] = member  # ty: ignore[invalid-assignment]
+
+        self._targets: dict[str, list[str]] = {}
+        self._field_validators: dict[str, list[str]] = {name: [] for name in self.fields}
+        for name, validator in self.validators.items():
+            declared = validator.extra[_self_namespace].get("fields", ())
+            if "*" in declared:
+                targets = list(self.fields)
+            else:
+                # Validators can declare fields that do not exist (`check_fields=False`).
+                targets = [field for field in dict.fromkeys(declared) if field in self.fields]
+            self._targets[name] = targets
+            for target in targets:
+                self._field_validators[target].append(name)
+
+    def targets(self, validator: str) -> list[Attribute]:
+        """Return the fields targeted by a validator.
+
+        Parameters:
+            validator: The name of the validator.
+
+        Raises:
+            KeyError: When the model has no such validator.
+
+        Returns:
+            Griffe attributes representing the fields.
+        """
+        return [self.fields[name] for name in self._targets[validator]]
+
+    def field_validators(self, field: str) -> list[Function]:
+        """Return the validators targeting a field.
+
+        Parameters:
+            field: The name of the field.
+
+        Raises:
+            KeyError: When the model has no such field.
 
+        Returns:
+            Griffe functions representing the validators.
+        """
+        return [self.validators[name] for name in self._field_validators[field]]
 
-def _model_validators(cls: Class) -> dict[str, Function]:
-    return {name: func for name, func in cls.all_members.items() if "pydantic-validator" in func.labels}  # ty: ignore[invalid-return-type]
+    def edges(self) -> Iterator[tuple[Function, Attribute]]:
+        """Iterate on the validator-field pairs of the graph.
+
+        Yields:
+            Validators along with the fields they target.
+        """
+        for name, targets in self._targets.items():
+            validator = self.validators[name]
+            for target in targets:
+                yield validator, self.fields[target]
+
+
+def _dump_json(data: Any) -> str:
+    """Serialize data as compact JSON.
+
+    The standard `json` module is used even when `orjson` is installed,
+    because `orjson` writes non-finite floats as `null` and rejects integers above 64 bits,
+    which would change the schemas of models using them (`Infinity` defaults, `le=2**70` constraints).
+
+    Parameters:
+        data: The data to serialize.
+
+    Returns:
+        Compact JSON.
+    """
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _load_json(text: str) -> Any:
+    """Deserialize JSON, with `orjson` if it is installed.
+
+    Parameters:
+        text: The JSON to deserialize.
+
+    Returns:
+        The deserialized data.
+    """
+    if _orjson is not None:
+        # `orjson` rejects the non-finite floats (`Infinity`, `NaN`) that `json` writes.
+        with suppress(ValueError):
+            return _orjson.loads(text)
+    return json.loads(text)
+
+
+def _format_json(data: Any) -> str:
+    """Serialize data as indented JSON, for display.
+
+    Parameters:
+        data: The data to serialize.
+
+    Returns:
+        Indented JSON.
+    """
+    return json.dumps(data, indent=2)
 
 
 def _json_schema(model: type[BaseModel]) -> str:
-    """Produce a model schema as JSON.
+    """Produce a model schema as compact JSON.
+
+    Schemas are kept compact in memory and in caches,
+    and only indented when rendered.
 
     Parameters:
         model: A Pydantic model.
 
     Returns:
-        A schema as JSON.
+        A schema as compact JSON.
+    """
+    return _dump_json(model.model_json_schema())
+
+
+class _Fragment:
+    """Render a fragment of a model's template, through the fragment cache of the model's package, if any.
+
+    Used in templates with `{% call class.extra.griffe_pydantic.fragment("name", config) %}...{% endcall %}`,
+    where `config` holds the handler options, which are part of the cache key.
     """
-    return json.dumps(model.model_json_schema(), indent=2)
+
+    def __init__(self, cls: Class) -> None:
+        """Initialize the fragment renderer.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+        """
+        self._cls = cls
+
+    def __call__(self, name: str, options: Any, caller: Callable[[], str]) -> str:
+        if (cache := self._cls.package.extra[_self_namespace].get("fragment_cache")) is None:
+            return caller()
+        return cache.render(self._cls, name, options, caller)
 
 
 def _process_class(cls: Class) -> None:
@@ -55,25 +277,41 @@ def _process_class(cls: Class) -> None:
         cls: The Griffe class representing the Pydantic model.
     """
     cls.labels.add("pydantic-model")
-    cls.extra[_self_namespace]["fields"] = partial(_model_fields, cls)
-    cls.extra[_self_namespace]["validators"] = partial(_model_validators, cls)
+    cls.extra[_self_namespace]["fields"] = _MembersIndex(cls, "pydantic-field")
+    cls.extra[_self_namespace]["validators"] = _MembersIndex(cls, "pydantic-validator")
+    cls.extra[_self_namespace]["fragment"] = _Fragment(cls)
     cls.extra[_mkdocstrings_namespace]["template"] = "pydantic_model.html.jinja"
 
 
-def _process_function(func: Function, cls: Class, fields: Sequence[str]) -> None:
+def _process_function(func: Function, fields: Sequence[str]) -> None:
     """Set metadata on a Pydantic validator.
 
+    Validators are linked to their fields later, see `_link_validators`.
+
     Parameters:
-        cls: A Griffe function representing the Pydantic validator.
+        func: A Griffe function representing the Pydantic validator.
+        fields: The names of the fields declared by the validator.
     """
     func.labels = {"pydantic-validator"}
-    if fields and fields[0] == "*":
-        targets = [member for member in cls.all_members.values() if "pydantic-field" in member.labels]
-    else:
-        targets = [cls.all_members[field] for field in fields]
-
-    func.extra[_self_namespace].setdefault("targets", [])
-    func.extra[_self_namespace]["targets"].extend(targets)
-    for target in targets:
-        target.extra[_self_namespace].setdefault("validators", [])
-        target.extra[_self_namespace]["validators"].append(func)
+    func.extra[_self_namespace]["fields"] = list(fields)
+
+
+def _link_validators(cls: Class) -> None:
+    """Build the validator graph of a Pydantic model, and link its validators and fields.
+
+    Validators that were already linked (for example inherited ones) are left untouched.
+
+    Parameters:
+        cls: The Griffe class representing the Pydantic model.
+    """
+    graph = ValidatorGraph(cls)
+    cls.extra[_self_namespace]["validator_graph"] = graph
+    for name, validator in graph.validators.items():
+        extra = validator.extra[_self_namespace]
+        if "targets" in extra:
+            continue
+        extra["targets"] = targets = graph.targets(name)
+        for target in targets:
+            validators = target.extra[_self_namespace].setdefault("validators", [])
+            if all(linked is not validator for linked in validators):
+                validators.append(validator)
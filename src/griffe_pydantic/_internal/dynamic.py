@@ -8,7 +8,6 @@ from griffe import (
     Docstring,
     Function,
     Kind,
-    get_logger,
 )
 
 from griffe_pydantic._internal import common
@@ -16,17 +15,24 @@ from griffe_pydantic._internal import common
 if TYPE_CHECKING:
     from collections.abc import Callable
 
+    from griffe_pydantic._internal.schema import _SchemaGenerator
+    from griffe_pydantic._internal.stats import ExtensionStats
 
-_logger = get_logger("griffe_pydantic")
 
-
-def _process_attribute(obj: Any, attr: Attribute, cls: Class, *, processed: set[str]) -> None:
+def _process_attribute(
+    obj: Any,
+    attr: Attribute,
+    cls: Class,
+    *,
+    processed: set[str],
+    stats: ExtensionStats | None = None,
+) -> None:
     """Handle Pydantic fields."""
     from pydantic.fields import FieldInfo  # noqa: PLC0415
 
-    if attr.canonical_path in processed:
+    if common._object_path(attr) in processed:
         return
-    processed.add(attr.canonical_path)
+    processed.add(common._object_path(attr))
     if attr.name == "model_config":
         cls.extra[common._self_namespace]["config"] = obj
         return
@@ -34,6 +40,8 @@ def _process_attribute(obj: Any, attr: Attribute, cls: Class, *, processed: set[
     if not isinstance(obj, FieldInfo):
         return
 
+    if stats is not None:
+        stats.fields += 1
     attr.labels = {"pydantic-field"}
     attr.value = obj.default
     constraints = {}
@@ -47,27 +55,41 @@ def _process_attribute(obj: Any, attr: Attribute, cls: Class, *, processed: set[
         attr.docstring = Docstring(docstring, parent=attr)
 
 
-def _process_function(obj: Callable, func: Function, cls: Class, *, processed: set[str]) -> None:
+def _process_function(
+    obj: Callable,
+    func: Function,
+    *,
+    processed: set[str],
+    stats: ExtensionStats | None = None,
+) -> None:
     """Handle Pydantic field validators."""
-    if func.canonical_path in processed:
+    if common._object_path(func) in processed:
         return
-    processed.add(func.canonical_path)
+    processed.add(common._object_path(func))
     if dec_info := getattr(obj, "decorator_info", None):
-        common._process_function(func, cls, dec_info.fields)
-
-
-def _process_class(obj: type, cls: Class, *, processed: set[str], schema: bool = False) -> None:
+        if stats is not None:
+            stats.validators += 1
+        common._process_function(func, dec_info.fields)
+
+
+def _process_class(
+    obj: type,
+    cls: Class,
+    *,
+    processed: set[str],
+    schemas: _SchemaGenerator | None = None,
+    stats: ExtensionStats | None = None,
+) -> None:
     """Detect and prepare Pydantic models."""
     common._process_class(cls)
-    if schema:
-        try:
-            cls.extra[common._self_namespace]["schema"] = common._json_schema(obj)  # ty: ignore[invalid-argument-type]
-        except Exception as exc:  # noqa: BLE001
-            # Schema generation can fail and raise Pydantic errors.
-            _logger.debug("Failed to generate schema for %s: %s", cls.path, exc)
+    if stats is not None:
+        stats.models += 1
+    if schemas is not None:
+        schemas.from_object(obj, cls)
     for member in cls.all_members.values():
         kind = member.kind
         if kind is Kind.ATTRIBUTE:
-            _process_attribute(getattr(obj, member.name), member, cls, processed=processed)  # ty: ignore[invalid-argument-type]
+            _process_attribute(getattr(obj, member.name), member, cls, processed=processed, stats=stats)  # ty: ignore[invalid-argument-type]
         elif kind is Kind.FUNCTION:
-            _process_function(getattr(obj, member.name), member, cls, processed=processed)  # ty: ignore[invalid-argument-type]
+            _process_function(getattr(obj, member.name), member, processed=processed, stats=stats)  # ty: ignore[invalid-argument-type]
+    common._link_validators(cls)
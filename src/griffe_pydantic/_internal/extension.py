@@ -1,56 +1,452 @@
 from __future__ import annotations
 
 import ast
-from typing import TYPE_CHECKING, Any
+import json
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from importlib import import_module
+from pathlib import Path
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Literal
+from weakref import WeakKeyDictionary, finalize
 
 from griffe import (
+    AliasResolutionError,
     Class,
+    CyclicAliasError,
+    Expr,
     Extension,
     Module,
     get_logger,
 )
 
-from griffe_pydantic._internal import dynamic, static
+from griffe_pydantic._internal import common, dynamic, static
+from griffe_pydantic._internal.cache import _AnalysisCache, _FragmentCache, _SchemaCache
+from griffe_pydantic._internal.index import ModelIndex
+from griffe_pydantic._internal.metadata import load_metadata
+from griffe_pydantic._internal.schema import _SchemaExport, _SchemaGenerator
+from griffe_pydantic._internal.stats import ExtensionStats
 
 if TYPE_CHECKING:
-    from griffe import ObjectNode
+    from collections.abc import Sequence
+    from types import ModuleType
+
+    from griffe import ModulesCollection, Object, ObjectNode
 
 
 _logger = get_logger("griffe_pydantic")
 
 
+class _LoaderState:
+    """State of the extension for the objects loaded by one loader (in one modules collection).
+
+    Loaders are not meant to be shared across threads, so this state is never locked.
+    """
+
+    def __init__(self) -> None:
+        self.processed: set[str] = set()
+        """Paths of processed objects."""
+        self.stats = ExtensionStats()
+        """Timings and counters of this loader."""
+        self.subclasses: static._SubclassIndex | None = None
+        """Subclass index of the loaded classes, for top-down discovery."""
+        # Transient state, reset at the start of each package.
+        self.package: Module | None = None
+        """The package being loaded."""
+        self.schemas: _SchemaGenerator | None = None
+        """The schema generator of the package being loaded."""
+        self.deferred: list[tuple[type, Class]] = []
+        """Models found during dynamic analysis whose ancestors were not loaded yet."""
+
+    def start_package(self, package: Module) -> None:
+        if package is not self.package:
+            self.package = package
+            self.schemas = None
+            self.deferred = []
+
+    def end_package(self) -> None:
+        self.package = None
+        self.schemas = None
+        self.deferred = []
+
+
 class PydanticExtension(Extension):
     """Griffe extension for Pydantic."""
 
-    def __init__(self, *, schema: bool = False) -> None:
+    def __init__(
+        self,
+        *,
+        schema: bool = False,
+        cache_dir: str | Path | None = None,
+        schema_cache_max_size: int = 100 * 1024 * 1024,
+        schema_workers: int = 0,
+        incremental: bool = False,
+        discovery: Literal["bottom-up", "top-down"] = "bottom-up",
+        model_bases: Sequence[str] = (),
+        log_stats: bool = False,
+        threads: int = 0,
+        prefilter: bool = False,
+        preimport: bool | Sequence[str] = False,
+        schema_batch: bool = False,
+        schema_export_dir: str | Path | None = None,
+        schema_export_url: str | None = None,
+        fragment_cache: bool = False,
+        fragment_cache_max_size: int = 100 * 1024 * 1024,
+        metadata: str | Path | None = None,
+        index: bool = False,
+    ) -> None:
         """Initialize the extension.
 
         Parameters:
             schema: Whether to compute and store the JSON schema of models.
+            cache_dir: A directory in which to cache the results of static analysis and the JSON schemas, across runs.
+                Modules whose sources (and the sources of their classes' ancestors) did not change
+                are not analyzed again, and cached schemas are reused without importing models.
+                Disabled by default.
+            schema_cache_max_size: The maximum size of the schema cache, in bytes.
+                Least recently used schemas are evicted first.
+            schema_workers: The number of worker processes used to import models and generate their schemas
+                during static analysis. With less than two workers, schemas are generated serially.
+            incremental: Whether to keep the results of static analysis in memory, to reuse them
+                when the same modules are loaded again in the same process, for example when
+                `mkdocs serve` rebuilds the documentation. Only changed modules, and modules
+                declaring subclasses of their classes, are analyzed again.
+            discovery: How models are detected during static analysis.
+                With `bottom-up`, the ancestry of each class is checked.
+                With `top-down`, a subclass index is built once per loader, as packages are loaded,
+                and walked down from Pydantic's `BaseModel`, so that only models are visited.
+            model_bases: Paths of additional base classes, whose subclasses must be handled as Pydantic models.
+                Useful when models inherit from classes that are not loaded, and wrap Pydantic's `BaseModel`.
+            log_stats: Whether to log a summary of the [stats][griffe_pydantic.PydanticExtension.stats]
+                of the current loader at the end of each package.
+            threads: The number of threads analyzing the members of models in parallel during static analysis,
+                in batches of models declared in the same module. With less than two threads,
+                members are analyzed serially. Results are identical either way.
+                Parallel analysis is mostly useful on free-threaded Python builds.
+            prefilter: Whether to skip, during static analysis, the modules that cannot declare models,
+                based on their imports: only modules importing Pydantic's `BaseModel` (or one of `model_bases`),
+                or importing from such modules (transitively), are scanned.
+                Speeds up the analysis of packages where models are declared in few modules.
+            preimport: Whether to import Pydantic in a background thread, as soon as the extension is created,
+                so that the import overlaps with the loading of packages instead of delaying
+                the detection of models or the generation of schemas. A list of additional modules
+                to import (for example the packages declaring the documented models) can be passed instead.
+                Import failures are logged once.
+            schema_batch: Whether to generate the schemas of all the models of a package together,
+                with Pydantic's `models_json_schema`, instead of one by one. Models then share a single table
+                of definitions (`$defs`), so that sub-models used by several models are generated once.
+                Standalone schemas are built from this table when read. They match the schemas generated
+                one by one, except for the names of definitions of models sharing a class name within the package,
+                which Pydantic qualifies with their module (`package__module__Item`). Schemas are still generated
+                lazily, the first time one of them is read, and `schema_workers` is ignored.
+            schema_export_dir: A directory in which to write schemas as JSON files, named after the hash
+                of their contents, for example a `schemas` folder in the site directory.
+                Models then link to their schema file instead of embedding the schema in pages,
+                which keeps pages with many large models small. Schemas are written when rendered.
+            schema_export_url: The URL from which `schema_export_dir` is served, used in links to schema files.
+                Required with `schema_export_dir`. It must include the path under which the site is served,
+                for example `/project/schemas` for a site served from `https://example.com/project/`.
+            fragment_cache: Whether to cache the HTML rendered for the schema, config, fields and validators
+                of models, so that unchanged models reuse it instead of being rendered (and highlighted) again.
+                Fragments are keyed by a fingerprint of each model's contents, and cached in `cache_dir`,
+                or in memory (across loads in the same process) when `cache_dir` is not set.
+                Handler options are part of the key, so fragments are rendered again when they change.
+            fragment_cache_max_size: The maximum size of the fragment cache, in `cache_dir` or in memory, in bytes.
+                Least recently used fragments are evicted first.
+            metadata: A JSON file of metadata dumped with [`dump_metadata`][griffe_pydantic.dump_metadata].
+                The metadata of packages found in this file is applied to them instead of analyzing them,
+                which does not require importing models or Pydantic (schemas are included in the metadata).
+            index: Whether to build, at the end of each package, a [model index][griffe_pydantic.ModelIndex]
+                of its models by field name, annotation and constraint,
+                stored in `package.extra["griffe_pydantic"]["index"]`.
         """
+        if discovery not in {"bottom-up", "top-down"}:
+            raise ValueError(f"Invalid discovery mode '{discovery}', expected 'bottom-up' or 'top-down'")
         super().__init__()
         self._schema = schema
-        self._processed: set[str] = set()
-        self._recorded: list[tuple[ObjectNode, Class]] = []
+        self._cache_dir = cache_dir
+        self._schema_cache_max_size = schema_cache_max_size
+        self._schema_workers = schema_workers
+        self._schema_batch = schema_batch
+        self._schema_export = None
+        if schema_export_dir is not None:
+            if schema_export_url is None:
+                raise ValueError("The 'schema_export_url' option is required with 'schema_export_dir'")
+            self._schema_export = _SchemaExport(schema_export_dir, schema_export_url)
+        self._incremental = incremental
+        self._index = index
+        self._metadata_file = metadata
+        self._metadata: dict[str, Any] | None = None
+        self._fragment_cache = None
+        if fragment_cache:
+            self._fragment_cache = _FragmentCache(cache_dir, fragment_cache_max_size)
+        self._discovery = discovery
+        self._bases = static._pydantic_bases.union(model_bases)
+        self._log_stats = log_stats
+        self._threads = threads
+        self._prefilter = prefilter
+        # Objects loaded by a new loader must be processed again, even if they have the same paths,
+        # so state is kept per modules collection, and dropped along with it.
+        # Several loaders can use the extension concurrently, in different threads:
+        # the lock is only acquired to create the state of a new loader, and to read stats.
+        self._states: WeakKeyDictionary[ModulesCollection, _LoaderState] = WeakKeyDictionary()
+        self._lock = Lock()
+        # Stats of the loaders that were garbage-collected, folded into `_released_stats` on read.
+        # Finalizers run during garbage collection, which can happen while the lock is held
+        # by the same thread, so they only append to this thread-safe queue, without locking.
+        self._released: deque[ExtensionStats] = deque()
+        self._released_stats = ExtensionStats()
+        self._pydantic_missing = False
+        self._preimport_errors: dict[str, str] = {}
+        self._preimport_thread: Thread | None = None
+        if preimport:
+            modules = ["pydantic", *(() if preimport is True else preimport)]
+            self._preimport_thread = Thread(
+                target=self._preimport,
+                args=(modules,),
+                name="griffe-pydantic-preimport",
+                daemon=True,
+            )
+            self._preimport_thread.start()
+
+    def _preimport(self, modules: Sequence[str]) -> None:
+        for module in modules:
+            try:
+                import_module(module)
+            except Exception as exc:  # noqa: BLE001, PERF203
+                # Modules can fail to import with any exception.
+                self._preimport_errors[module] = f"{exc.__class__.__name__}: {exc}"
+
+    def _wait_preimport(self) -> None:
+        if (thread := self._preimport_thread) is None:
+            return
+        thread.join()
+        with self._lock:
+            if self._preimport_thread is None:
+                return
+            self._preimport_thread = None
+        for module, error in self._preimport_errors.items():
+            _logger.warning(f"Could not pre-import {module}: {error}")
+
+    def _import_pydantic(self) -> ModuleType | None:
+        self._wait_preimport()
+        try:
+            import pydantic  # noqa: PLC0415
+        except ImportError:
+            if not self._pydantic_missing:
+                self._pydantic_missing = True
+                _logger.warning("could not import pydantic - models will not be detected")
+            return None
+        return pydantic
+
+    @property
+    def stats(self) -> ExtensionStats:
+        """Timings and counters, accumulated over all handled packages.
+
+        A new object is returned on each access, aggregating the stats of all loaders.
+        """
+        with self._lock:
+            while self._released:
+                self._released_stats._add(self._released.popleft())
+            stats = ExtensionStats()
+            stats._add(self._released_stats)
+            for state in list(self._states.values()):
+                stats._add(state.stats)
+        return stats
+
+    def _release(self, state: _LoaderState) -> None:
+        self._released.append(state.stats)
+
+    def _state(self, collection: ModulesCollection) -> _LoaderState:
+        if (state := self._states.get(collection)) is None:
+            with self._lock:
+                if (state := self._states.get(collection)) is None:
+                    state = self._states[collection] = _LoaderState()
+                    finalize(collection, self._release, state)
+        return state
+
+    def _load_metadata(self, pkg: Module) -> list[Object] | None:
+        if self._metadata_file is None:
+            return None
+        if self._metadata is None:
+            with self._lock:
+                if self._metadata is None:
+                    self._metadata = json.loads(Path(self._metadata_file).read_text(encoding="utf8"))
+        if pkg.path not in self._metadata.get("packages", {}):  # ty: ignore[possibly-missing-attribute]
+            return None
+        return load_metadata(pkg, self._metadata)  # ty: ignore[invalid-argument-type]
+
+    def _schema_generator(self, state: _LoaderState) -> _SchemaGenerator | None:
+        if self._schema and state.schemas is None:
+            schema_cache = None
+            if self._cache_dir is not None:
+                schema_cache = _SchemaCache(self._cache_dir, self._schema_cache_max_size)
+            state.schemas = _SchemaGenerator(
+                cache=schema_cache,
+                workers=self._schema_workers,
+                batch=self._schema_batch,
+                export=self._schema_export,
+                stats=state.stats,
+            )
+        return state.schemas
+
+    def _process_dynamic(self, state: _LoaderState, obj: type, cls: Class) -> None:
+        with state.stats._timing("dynamic"):
+            state.processed.add(common._object_path(cls))
+            dynamic._process_class(
+                obj,
+                cls,
+                processed=state.processed,
+                schemas=self._schema_generator(state),
+                stats=state.stats,
+            )
+            common._MembersIndex.invalidate()
+
+    def _finish_package(self, state: _LoaderState, pkg: Module) -> None:
+        # Shared by packages that are analyzed and packages whose metadata is loaded.
+        state.end_package()
+        common._MembersIndex.invalidate()
+        if self._index:
+            pkg.extra[common._self_namespace]["index"] = ModelIndex.from_package(pkg)
+        if self._fragment_cache is not None:
+            pkg.extra[common._self_namespace]["fragment_cache"] = self._fragment_cache
+            self._fragment_cache.prune()
+        if self._log_stats:
+            _logger.info(f"Stats after package {pkg.path}: {state.stats.summary()}")
 
     def on_package(self, *, pkg: Module, **kwargs: Any) -> None:  # noqa: ARG002
         """Detect models once the whole package is loaded."""
-        for node, cls in self._recorded:
-            self._processed.add(cls.canonical_path)
-            dynamic._process_class(node.obj, cls, processed=self._processed, schema=self._schema)
-        static._process_module(pkg, processed=self._processed, schema=self._schema)
+        if self._schema:
+            self._wait_preimport()
+        state = self._state(pkg.modules_collection)
+        state.start_package(pkg)
+        if (objects := self._load_metadata(pkg)) is not None:
+            state.processed.update(common._object_path(obj) for obj in objects)
+            if self._schema_export is not None:
+                # Exported schemas are written again to this build's directory.
+                for obj in objects:
+                    if (schema := obj.extra[common._self_namespace].get("schema")) is not None:
+                        obj.extra[common._self_namespace]["schema_url"] = partial(self._schema_export.link, schema)
+            self._finish_package(state, pkg)
+            return
+        cache = None
+        if self._cache_dir is not None or self._incremental:
+            cache = _AnalysisCache(self._cache_dir, memory=self._incremental, bases=self._bases)
+        schemas = self._schema_generator(state)
+        for obj, cls in state.deferred:
+            self._process_dynamic(state, obj, cls)
+        # Whether classes inherit from Pydantic models, by canonical path.
+        # Results are only memoized for this package: classes that do not seem to inherit
+        # from models may turn out to, once the packages declaring their bases are loaded.
+        ancestry: dict[str, bool] = {}
+        discovery = None
+        if self._discovery == "top-down":
+            with state.stats._timing("discovery"):
+                if state.subclasses is None:
+                    state.subclasses = static._SubclassIndex(pkg.modules_collection, self._bases)
+                discovery = state.subclasses.discover(pkg, state.stats)
+        with state.stats._timing("static"), ExitStack() as stack:
+            providers = static._model_providers(pkg.modules_collection, self._bases) if self._prefilter else None
+            run = keys = None
+            if self._threads > 1:
+                executor = stack.enter_context(ThreadPoolExecutor(max_workers=self._threads))
+                run = static._ParallelRun(executor, state.stats)
+                if cache is not None:
+                    # Cached analyses are applied first, so that the run is only flushed once.
+                    keys = static._load_cached_modules(
+                        pkg,
+                        processed=state.processed,
+                        cache=cache,
+                        schemas=schemas,
+                        stats=state.stats,
+                        providers=providers,
+                    )
+            static._process_module(
+                pkg,
+                processed=state.processed,
+                cache=cache,
+                schemas=schemas,
+                ancestry=ancestry,
+                bases=self._bases,
+                stats=state.stats,
+                run=run,
+                providers=providers,
+                keys=keys,
+                discovery=discovery,
+            )
+            if run is not None:
+                run.flush()
+        if schemas is not None:
+            schemas.finish()
+        self._finish_package(state, pkg)
+
+    # YORE: Bump 2: Remove block.
+    def on_class_instance(self, *, node: ast.AST | ObjectNode, cls: Class, **kwargs: Any) -> None:
+        """Deprecated. Models are detected in [`on_class_members`][griffe_pydantic.PydanticExtension.on_class_members].
+
+        Griffe still triggers this hook (passing its agent), which does nothing then.
+        Direct calls are forwarded to `on_class_members`.
+        """
+        if "agent" in kwargs:
+            return
+        warnings.warn(
+            "`PydanticExtension.on_class_instance` is deprecated. Use `on_class_members` instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        self.on_class_members(node=node, cls=cls, **kwargs)
+
+    def on_class_members(self, *, node: ast.AST | ObjectNode, cls: Class, **kwargs: Any) -> None:  # noqa: ARG002
+        """Detect and prepare Pydantic models, as soon as their members are inspected.
 
-    def on_class_instance(self, *, node: ast.AST | ObjectNode, cls: Class, **kwargs: Any) -> None:  # noqa: ARG002
-        """Detect and prepare Pydantic models."""
+        Only the model itself is retained (not the inspection node), and only until
+        the package is loaded, when some of its ancestors are not loaded yet.
+        """
         # Prevent running during static analysis.
         if isinstance(node, ast.AST):
             return
 
-        try:
-            import pydantic  # noqa: PLC0415
-        except ImportError:
-            _logger.warning("could not import pydantic - models will not be detected")
+        if (pydantic := self._import_pydantic()) is None:
             return
 
-        if issubclass(node.obj, pydantic.BaseModel):
-            self._recorded.append((node, cls))
+        obj = node.obj
+        if not issubclass(obj, pydantic.BaseModel):
+            return
+        state = self._state(cls.modules_collection)
+        state.start_package(cls.package)
+        if _ancestors_loaded(cls):
+            self._process_dynamic(state, obj, cls)
+        else:
+            state.deferred.append((obj, cls))
+
+
+def _ancestors_loaded(cls: Class) -> bool:
+    """Tell whether the ancestors of a class that belong to its package are all loaded.
+
+    Parameters:
+        cls: A Griffe class.
+
+    Returns:
+        True/False.
+    """
+    # The package may not be registered in the modules collection yet, so we look up objects from it.
+    package = cls.package
+    stack = [cls]
+    while stack:
+        current = stack.pop()
+        for base in current.bases:
+            path = base.canonical_path if isinstance(base, Expr) else base
+            if not path.startswith(f"{package.path}."):
+                continue
+            try:
+                parent = package[path[len(package.path) + 1 :]]
+                if parent.is_class:
+                    stack.append(parent)
+            except KeyError:
+                return False
+            except (AliasResolutionError, CyclicAliasError):
+                continue
+    return True
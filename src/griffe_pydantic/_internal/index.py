@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from griffe import ExprName
+
+from griffe_pydantic._internal import common, serialization, static
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from griffe import Attribute, Class, Module
+
+
+def _annotation_paths(annotation: object) -> Iterator[str]:
+    """Yield the canonical paths of the names used in an annotation.
+
+    Parameters:
+        annotation: A Griffe expression, or a string.
+
+    Yields:
+        Canonical paths.
+    """
+    if isinstance(annotation, str):
+        yield annotation
+    elif annotation is not None:
+        for element in annotation.iterate(flat=True):  # ty: ignore[unresolved-attribute]
+            if isinstance(element, ExprName):
+                yield element.canonical_path
+
+
+class ModelIndex:
+    """Inverted index of Pydantic models and their fields, by field name, annotation and constraint.
+
+    Models are indexed with all their fields, inherited ones included.
+    Fields are returned as declared (in the model that declares them).
+    The index of a package is built by the extension when its `index` option is enabled,
+    and is available as `package.extra["griffe_pydantic"]["index"]`.
+    """
+
+    def __init__(self, models: Iterable[Class] = ()) -> None:
+        """Initialize the index.
+
+        Parameters:
+            models: The Griffe classes representing the Pydantic models to index.
+        """
+        self.models: dict[str, Class] = {}
+        """The indexed models, by path."""
+        self._fields: dict[str, dict[str, dict[str, Attribute]]] = {
+            "name": defaultdict(dict),
+            "annotation": defaultdict(dict),
+            "constraint": defaultdict(dict),
+        }
+        self._models: dict[str, dict[str, dict[str, Class]]] = {
+            "name": defaultdict(dict),
+            "annotation": defaultdict(dict),
+            "constraint": defaultdict(dict),
+        }
+        for cls in models:
+            self.add(cls)
+
+    @classmethod
+    def from_package(cls, package: Module) -> ModelIndex:
+        """Build the index of the models declared in a package, nested models included.
+
+        Parameters:
+            package: The Griffe package, loaded with the extension.
+
+        Returns:
+            The index.
+        """
+        return cls(model for mod in static._iter_modules(package) for model in serialization._iter_models(mod))
+
+    def _insert(self, table: str, key: str, model: Class, field: Attribute) -> None:
+        self._fields[table][key][field.path] = field
+        self._models[table][key][model.path] = model
+
+    def add(self, cls: Class) -> None:
+        """Index a model and its fields.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+        """
+        self.models[cls.path] = cls
+        for name, member in cls.extra[common._self_namespace]["fields"]().items():
+            # Inherited fields are indexed once, as declared.
+            if (field := serialization._resolve(member)) is None:
+                continue
+            self._insert("name", name, cls, field)
+            for path in _annotation_paths(field.annotation):
+                self._insert("annotation", path, cls, field)
+            for constraint in field.extra[common._self_namespace].get("constraints", {}):
+                self._insert("constraint", constraint, cls, field)
+
+    def fields_named(self, name: str) -> list[Attribute]:
+        """Return the fields with the given name.
+
+        Parameters:
+            name: A field name.
+
+        Returns:
+            The fields.
+        """
+        return list(self._fields["name"].get(name, {}).values())
+
+    def fields_annotated_with(self, path: str) -> list[Attribute]:
+        """Return the fields whose annotation uses the given object, like `list[Address]` uses `Address`.
+
+        Parameters:
+            path: The canonical path of an object, like `package.models.Address` or `int`.
+
+        Returns:
+            The fields.
+        """
+        return list(self._fields["annotation"].get(path, {}).values())
+
+    def fields_constrained_by(self, constraint: str) -> list[Attribute]:
+        """Return the fields having the given constraint.
+
+        Parameters:
+            constraint: A constraint name, like `pattern` or `ge`.
+
+        Returns:
+            The fields.
+        """
+        return list(self._fields["constraint"].get(constraint, {}).values())
+
+    def models_with_field(self, name: str) -> list[Class]:
+        """Return the models having (or inheriting) a field with the given name.
+
+        Parameters:
+            name: A field name.
+
+        Returns:
+            The models.
+        """
+        return list(self._models["name"].get(name, {}).values())
+
+    def models_embedding(self, path: str) -> list[Class]:
+        """Return the models having (or inheriting) a field whose annotation uses the given object.
+
+        Parameters:
+            path: The canonical path of an object, like `package.models.Address`.
+
+        Returns:
+            The models.
+        """
+        return list(self._models["annotation"].get(path, {}).values())
+
+    def models_constrained_by(self, constraint: str) -> list[Class]:
+        """Return the models having (or inheriting) a field with the given constraint.
+
+        Parameters:
+            constraint: A constraint name, like `pattern` or `ge`.
+
+        Returns:
+            The models.
+        """
+        return list(self._models["constraint"].get(constraint, {}).values())
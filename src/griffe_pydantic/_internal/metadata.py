@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from griffe import Expr, ModulesCollection
+
+from griffe_pydantic._internal import common, serialization, static
+from griffe_pydantic._internal.schema import _stored_schema
+
+if TYPE_CHECKING:
+    from griffe import Module, Object
+
+
+_metadata_version = 1
+
+
+def dump_metadata(*packages: Module) -> dict[str, Any]:
+    """Dump the Pydantic metadata of loaded packages as plain, JSON-serializable data.
+
+    Griffe's own JSON dumps do not contain the metadata of extensions.
+    This function dumps the models' labels, config, fields, validators (and the fields they target)
+    and JSON schemas (with the URLs of exported schemas), referencing objects by their path,
+    so that it can be shipped along with a Griffe dump, and loaded back with
+    [`load_metadata`][griffe_pydantic.load_metadata] without analyzing packages again.
+
+    Schemas that were not generated yet are generated.
+
+    Parameters:
+        *packages: The Griffe packages, loaded with the extension.
+
+    Returns:
+        The metadata.
+    """
+    dumped: dict[str, dict[str, dict[str, Any]]] = {}
+    for package in packages:
+        objects = dumped[package.path] = {}
+        for mod in static._iter_modules(package):
+            # Inherited members declared in other packages are dumped along with these packages.
+            objects.update(
+                (path, data)
+                for path, data in serialization._dump_module(mod).items()
+                if path.startswith(f"{package.path}.")
+            )
+            for cls in serialization._iter_models(mod):
+                extra = cls.extra[common._self_namespace]
+                if (schema := extra.get("schema")) is not None:
+                    objects[cls.canonical_path]["schema"] = schema.compact()
+                if (schema_url := extra.get("schema_url")) is not None:
+                    objects[cls.canonical_path]["schema_url"] = schema_url()
+    return {"version": _metadata_version, "packages": dumped}
+
+
+def load_metadata(package: Module, metadata: dict[str, Any]) -> list[Object]:
+    """Apply Pydantic metadata dumped with [`dump_metadata`][griffe_pydantic.dump_metadata] onto a package.
+
+    The package can be loaded from sources (without the extension) or from a Griffe JSON dump.
+    The same API as when the package is analyzed by the extension is rebuilt.
+
+    Parameters:
+        package: The Griffe package.
+        metadata: The dumped metadata.
+
+    Raises:
+        ValueError: When the metadata has an unsupported version.
+        KeyError: When the metadata does not contain the package, or references unknown objects.
+
+    Returns:
+        The Griffe objects the metadata was applied to.
+    """
+    if (version := metadata.get("version")) != _metadata_version:
+        raise ValueError(f"Unsupported metadata version {version}, expected {_metadata_version}")
+    objects = metadata["packages"][package.path]
+    try:
+        package.modules_collection  # noqa: B018
+    except ValueError:
+        # Packages loaded from Griffe JSON dumps are not attached to a modules collection,
+        # which is needed to resolve aliases and paths. Setting the package as a member
+        # of a collection attaches it to the collection.
+        ModulesCollection().set_member(package.path, package)
+        # Bases are not attached to their scope when decoded, so they cannot be resolved,
+        # and inherited members (like fields) would be missing.
+        for cls in static._iter_classes(package):
+            for base in cls.bases:
+                if isinstance(base, Expr):
+                    serialization._attach_parent(base, cls.parent)  # ty: ignore[invalid-argument-type]
+    loaded = serialization._load_objects(package, objects)
+    for obj in loaded:
+        data = objects[obj.canonical_path]
+        if (schema := data.get("schema")) is not None:
+            obj.extra[common._self_namespace]["schema"] = _stored_schema(schema)
+        if "schema_url" in data:
+            obj.extra[common._self_namespace]["schema_url"] = lambda url=data["schema_url"]: url
+    return loaded
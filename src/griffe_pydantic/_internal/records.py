@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import ast
+from typing import TYPE_CHECKING, Any
+
+from griffe_pydantic._internal import common, serialization, static
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import TextIO
+
+    from griffe import Class, Module
+
+
+def _plain(value: Any, *, source: bool = False) -> Any:
+    """Convert a value (Griffe expression, source string or Python object) to plain JSON data.
+
+    Parameters:
+        value: The value to convert.
+        source: Whether the value is source code (static analysis), like `0` or `'^a'`,
+            in which case simple literals are evaluated, to export `0` and `"^a"`.
+
+    Returns:
+        The value itself if it is a JSON scalar, its string representation otherwise.
+    """
+    if source and value is not None:
+        try:
+            literal = ast.literal_eval(str(value))
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            return str(value)
+        if literal is None or isinstance(literal, (str, bool, int, float)):
+            return literal
+        return str(value)
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    return str(value)
+
+
+def _model_record(cls: Class, *, schema: bool = True) -> dict[str, Any]:
+    """Build a plain-data record of a model: its fields, validators, config and schema.
+
+    Parameters:
+        cls: The Griffe class representing the Pydantic model.
+        schema: Whether to include the schema.
+
+    Returns:
+        A JSON-serializable record.
+    """
+    extra = cls.extra[common._self_namespace]
+    fields = {}
+    for name, field in extra["fields"]().items():
+        field_extra = field.extra[common._self_namespace]
+        # Statically analyzed fields hold source code, inspected ones hold Python objects.
+        source = field.analysis != "dynamic"
+        fields[name] = {
+            "path": field.path,
+            "annotation": _plain(field.annotation),
+            "default": _plain(field.value, source=source),
+            "docstring": field.docstring.value if field.docstring else None,
+            "constraints": {
+                key: _plain(value, source=source) for key, value in field_extra.get("constraints", {}).items()
+            },
+            "validators": [validator.path for validator in field_extra.get("validators", [])],
+        }
+    validators = {
+        name: {
+            "path": validator.path,
+            "fields": [target.path for target in validator.extra[common._self_namespace].get("targets", [])],
+        }
+        for name, validator in extra["validators"]().items()
+    }
+    config = extra.get("config")
+    record = {
+        "path": cls.path,
+        "fields": fields,
+        "validators": validators,
+        "config": {key: _plain(value) for key, value in config.items()} if config is not None else None,
+    }
+    if schema:
+        record["schema"] = json_schema.data() if (json_schema := extra.get("schema")) is not None else None
+    return record
+
+
+def iter_model_records(*packages: Module, schema: bool = False) -> Iterator[dict[str, Any]]:
+    """Yield plain-data records of the models of packages loaded with the extension, one model at a time.
+
+    Each record contains the path of the model, its fields (with their constraints and validators),
+    its validators (with the fields they target), its config, and optionally its schema.
+    Records are built only when requested, and are not retained,
+    so that they can be consumed while the next ones are built.
+
+    Parameters:
+        *packages: The Griffe packages.
+        schema: Whether to include the JSON schema of models (enable the extension's `schema` option).
+            Schemas are generated as records are built, if they were not already.
+
+    Yields:
+        JSON-serializable records.
+    """
+    for package in packages:
+        for mod in static._iter_modules(package):
+            for cls in serialization._iter_models(mod):
+                yield _model_record(cls, schema=schema)
+
+
+def write_model_records(records: Iterable[dict[str, Any]], file: TextIO) -> int:
+    """Write records as JSON Lines, one record per line, as they come.
+
+    Parameters:
+        records: The records, for example from [`iter_model_records`][griffe_pydantic.iter_model_records].
+        file: A text file open for writing.
+
+    Returns:
+        The number of written records.
+    """
+    count = 0
+    for record in records:
+        file.write(common._dump_json(record))
+        file.write("\n")
+        count += 1
+    return count
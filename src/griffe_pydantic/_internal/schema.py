@@ -0,0 +1,513 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from griffe import dynamic_import, get_logger
+
+from griffe_pydantic._internal import common
+from griffe_pydantic._internal.cache import _write_atomically
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from contextlib import AbstractContextManager
+
+    from griffe import Class
+
+    from griffe_pydantic._internal.cache import _SchemaCache
+    from griffe_pydantic._internal.stats import ExtensionStats
+
+
+_logger = get_logger("griffe_pydantic")
+
+_defs_prefix = "#/$defs/"
+
+
+def _import_paths(cls: Class) -> list[Path | str]:
+    import_path: Path | list[Path] = cls.package.filepath
+    if isinstance(import_path, list):
+        import_path = import_path[-1]
+    if import_path.name == "__init__.py":
+        import_path = import_path.parent
+    return [import_path.parent, *sys.path]
+
+
+def _generate_schema(path: str, import_paths: list[Path | str]) -> tuple[str | None, str | None]:
+    """Import a Pydantic model and produce its schema as compact JSON.
+
+    This function runs in worker processes, so it returns errors instead of logging them.
+
+    Parameters:
+        path: The path of the model.
+        import_paths: The paths in which to search for the model's package.
+
+    Returns:
+        The schema (or none), and an error message (or none).
+    """
+    try:
+        model = dynamic_import(path, import_paths=import_paths)  # ty: ignore[invalid-argument-type]
+    except ImportError:
+        return None, f"Could not import class {path} for JSON schema"
+    try:
+        return common._json_schema(model), None
+    except Exception as exc:  # noqa: BLE001
+        # Schema generation can fail and raise Pydantic errors.
+        return None, f"Failed to generate schema for {path}: {exc}"
+
+
+class _LazySchema:
+    """The JSON schema of a model, computed and memoized the first time it is read.
+
+    The schema is kept as compact JSON. Call the instance to get it as indented JSON,
+    or none if it could not be generated.
+    """
+
+    def __init__(self, compute: Callable[[], str | None]) -> None:
+        """Initialize the lazy schema.
+
+        Parameters:
+            compute: A function computing the schema as compact JSON.
+        """
+        self._compute: Callable[[], str | None] | None = compute
+        self._schema: str | None = None
+
+    def __call__(self) -> str | None:
+        if (schema := self.compact()) is None:
+            return None
+        return common._format_json(common._load_json(schema))
+
+    def compact(self) -> str | None:
+        """Return the schema as compact JSON.
+
+        Returns:
+            The schema, or none if it could not be generated.
+        """
+        if self._compute is not None:
+            self._schema = self._compute()
+            self._compute = None
+        return self._schema
+
+    def data(self) -> dict[str, Any] | None:
+        """Return the schema as structured data.
+
+        Returns:
+            The schema, or none if it could not be generated.
+        """
+        if (schema := self.compact()) is None:
+            return None
+        return common._load_json(schema)
+
+    def _set(self, schema: str | None) -> None:
+        self._schema = schema
+        self._compute = None
+
+
+def _stored_schema(schema: str) -> _LazySchema:
+    """Wrap an already generated schema.
+
+    Parameters:
+        schema: The schema as compact JSON.
+
+    Returns:
+        The schema.
+    """
+    lazy_schema = _LazySchema(lambda: None)
+    lazy_schema._set(schema)
+    return lazy_schema
+
+
+def _standalone_schema(reference: dict[str, Any], definitions: dict[str, Any]) -> dict[str, Any]:
+    """Build the standalone schema of a model from its reference in a table of definitions.
+
+    The standalone schema embeds the definitions it transitively references, like the ones built
+    by `model_json_schema`. Definitions keep the names they have in the table: when models of the batch
+    share a class name, Pydantic qualifies them (`package__module__Item` instead of `Item`),
+    so the schema differs from the one `model_json_schema` would build.
+
+    Parameters:
+        reference: The schema of the model, referencing a definition.
+        definitions: The table of definitions.
+
+    Returns:
+        A schema.
+    """
+    if not isinstance(ref := reference.get("$ref"), str) or not ref.startswith(_defs_prefix):
+        return reference
+    name = ref[len(_defs_prefix) :]
+    used: dict[str, Any] = {}
+    stack: list[Any] = [definitions[name]]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if (
+                isinstance(ref, str)
+                and ref.startswith(_defs_prefix)
+                and (used_name := ref[len(_defs_prefix) :]) not in used
+            ):
+                used[used_name] = definitions[used_name]
+                stack.append(used[used_name])
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    if name in used:
+        # Recursive models reference themselves.
+        return {"$defs": {key: used[key] for key in sorted(used)}, "$ref": reference["$ref"]}
+    if used:
+        return {"$defs": {key: used[key] for key in sorted(used)}, **definitions[name]}
+    return definitions[name]
+
+
+class _SchemaBatch:
+    """JSON schemas of all the models of a package, generated together, sharing a table of definitions.
+
+    The batch is generated the first time the schema of one of its models is read.
+    """
+
+    def __init__(self, generator: _SchemaGenerator) -> None:
+        """Initialize the batch.
+
+        Parameters:
+            generator: The schema generator, providing the cache and stats.
+        """
+        self._generator = generator
+        self._models: dict[str, tuple[Class, Callable[[], type | None]]] = {}
+        self._cached: dict[str, str] = {}
+        self._generated = False
+        self.definitions: dict[str, Any] = {}
+        """The definitions shared by the models' schemas."""
+        self.references: dict[str, dict[str, Any]] = {}
+        """The schemas of the models, referencing the shared definitions, by model path."""
+
+    def add(self, cls: Class, load: Callable[[], type | None]) -> _BatchedSchema:
+        """Add a model to the batch.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+            load: A function returning the Pydantic model.
+
+        Returns:
+            The schema of the model.
+        """
+        self._models[cls.path] = (cls, load)
+        self._generated = False
+        return _BatchedSchema(self, cls.path)
+
+    def generate(self) -> None:
+        """Generate the schemas of models that were added since the last generation."""
+        if self._generated:
+            return
+        self._generated = True
+        models, self._models = self._models, {}
+        with self._generator._timing():
+            separate = self._generate(models)
+        # Schemas generated separately are timed on their own.
+        for path, cls, obj in separate:
+            if (json_schema := self._generator._compute(cls, lambda obj=obj: obj)) is not None:
+                self._cached[path] = json_schema
+
+    def _generate(self, models: dict[str, tuple[Class, Callable[[], type | None]]]) -> list[tuple[str, Class, type]]:
+        # Returns the models whose schemas must be generated separately.
+        from pydantic.json_schema import models_json_schema  # noqa: PLC0415
+
+        generator = self._generator
+        cache = generator.cache
+        pending: list[tuple[str, Class, type, str | None]] = []
+        for path, (cls, load) in models.items():
+            # Batched schemas can name definitions differently than standalone ones:
+            # they are cached separately, so that each mode gets back the schemas it generated.
+            key = cache.key(cls) if cache is not None else None
+            key = f"{key}-batch" if key is not None else None
+            if key is not None and (schema := cache.get(key)) is not None:  # ty: ignore[possibly-missing-attribute]
+                generator._count("schema_cache_hits")
+                self._cached[path] = schema
+            elif (obj := load()) is None:
+                generator._count("schema_failures")
+            else:
+                pending.append((path, cls, obj, key))
+        if not pending:
+            return []
+
+        try:
+            references, schema = models_json_schema(
+                [(obj, "validation") for _, _, obj, _ in pending],  # ty: ignore[invalid-argument-type]
+            )
+        except Exception as exc:  # noqa: BLE001
+            # Schema generation can fail and raise Pydantic errors. Fall back to generating schemas one by one.
+            _logger.debug(f"Failed to generate schemas together, generating them separately: {exc}")
+            return [(path, cls, obj) for path, cls, obj, _ in pending]
+
+        # Models added after a previous generation can declare definitions with the same names
+        # as the previous ones, but different contents: they would be overwritten.
+        definitions = schema.get("$defs", {})
+        if any(self.definitions.get(name, definition) != definition for name, definition in definitions.items()):
+            _logger.debug("Definitions clash with previously generated ones, generating schemas separately")
+            return [(path, cls, obj) for path, cls, obj, _ in pending]
+
+        self.definitions.update(definitions)
+        for path, _, obj, key in pending:
+            generator._count("schemas")
+            self.references[path] = references[(obj, "validation")]
+            if key is not None:
+                cache.set(key, common._dump_json(_standalone_schema(self.references[path], self.definitions)))  # ty: ignore[possibly-missing-attribute]
+        return []
+
+
+class _BatchedSchema:
+    """The JSON schema of a model, generated along with the other models of its package.
+
+    Call the instance to get the standalone schema as indented JSON, or none if it could not be generated.
+    """
+
+    def __init__(self, batch: _SchemaBatch, path: str) -> None:
+        """Initialize the schema.
+
+        Parameters:
+            batch: The batch of schemas.
+            path: The path of the model.
+        """
+        self._batch = batch
+        self._path = path
+
+    def __call__(self) -> str | None:
+        if (schema := self.data()) is None:
+            return None
+        return common._format_json(schema)
+
+    def compact(self) -> str | None:
+        """Return the standalone schema as compact JSON.
+
+        Returns:
+            The schema, or none if it could not be generated.
+        """
+        if (schema := self.data()) is None:
+            return None
+        return common._dump_json(schema)
+
+    def data(self) -> dict[str, Any] | None:
+        """Return the standalone schema as structured data.
+
+        Returns:
+            The schema, or none if it could not be generated.
+        """
+        self._batch.generate()
+        if (schema := self._batch._cached.get(self._path)) is not None:
+            return common._load_json(schema)
+        if (reference := self.reference()) is None:
+            return None
+        return _standalone_schema(reference, self._batch.definitions)
+
+    def reference(self) -> dict[str, Any] | None:
+        """Return the schema of the model, referencing the shared definitions.
+
+        Returns:
+            A schema, or none if it could not be generated, was reused from the cache, or was generated separately.
+        """
+        self._batch.generate()
+        return self._batch.references.get(self._path)
+
+    def definitions(self) -> dict[str, Any]:
+        """Return the definitions shared by the schemas of the models of the package.
+
+        Returns:
+            The definitions, by name.
+        """
+        self._batch.generate()
+        return self._batch.definitions
+
+
+class _SchemaExport:
+    """Export of JSON schemas to files named after the hash of their contents.
+
+    Each distinct schema is written once, so that pages can link to it instead of embedding it.
+    Files are checked on each link, so that files deleted in the meantime (by a clean build) are written again.
+    """
+
+    def __init__(self, directory: str | Path, url: str) -> None:
+        """Initialize the export.
+
+        Parameters:
+            directory: The directory in which to write schemas.
+            url: The URL from which the directory is served.
+        """
+        self.directory = Path(directory)
+        """The directory in which to write schemas."""
+        self.url = url.rstrip("/")
+        """The URL from which the directory is served."""
+
+    def link(self, schema: _LazySchema | _BatchedSchema) -> str | None:
+        """Write a schema to a file (unless it exists), and return its URL.
+
+        Parameters:
+            schema: The schema.
+
+        Returns:
+            The URL of the schema, or none if it could not be generated or written.
+        """
+        if (contents := schema.compact()) is None:
+            return None
+        name = f"{hashlib.sha256(contents.encode()).hexdigest()[:16]}.json"
+        filepath = self.directory / name
+        if not filepath.exists():
+            try:
+                _write_atomically(filepath, contents)
+            except OSError as exc:
+                _logger.debug(f"Could not export schema to {filepath}: {exc}")
+                return None
+        return f"{self.url}/{name}"
+
+
+class _SchemaGenerator:
+    """Compute the JSON schemas of models, through a cache and optionally a pool of worker processes.
+
+    Schemas are stored as lazy schemas,
+    so that only the schemas that are actually read get generated,
+    unless worker processes are used, in which case schemas are generated eagerly, in parallel.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache: _SchemaCache | None = None,
+        workers: int = 0,
+        batch: bool = False,
+        export: _SchemaExport | None = None,
+        stats: ExtensionStats | None = None,
+    ) -> None:
+        """Initialize the generator.
+
+        Parameters:
+            cache: A cache from which to reuse schemas, without importing models.
+            workers: The number of worker processes importing models and generating schemas
+                during static analysis. With less than two workers, schemas are generated lazily,
+                in the current process.
+            batch: Whether to generate the schemas of all models together, sharing their definitions.
+                Worker processes are not used in this case.
+            export: An export of schemas to files, to link to them instead of embedding them in pages.
+            stats: Stats to update.
+        """
+        self.cache = cache
+        """The schema cache."""
+        self.workers = workers
+        """The number of worker processes."""
+        self.stats = stats
+        """Stats to update."""
+        self.batch = _SchemaBatch(self) if batch else None
+        """The batch of schemas, when generating schemas together."""
+        self.export = export
+        """The export of schemas to files."""
+        self._jobs: list[tuple[Class, _LazySchema]] = []
+
+    def _timing(self) -> AbstractContextManager[None]:
+        return self.stats._timing("schemas") if self.stats is not None else nullcontext()
+
+    def _count(self, counter: str) -> None:
+        if self.stats is not None:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def _install(self, cls: Class, schema: _LazySchema | _BatchedSchema) -> None:
+        cls.extra[common._self_namespace]["schema"] = schema
+        if self.export is not None:
+            cls.extra[common._self_namespace]["schema_url"] = partial(self.export.link, schema)
+
+    def _compute(self, cls: Class, load: Callable[[], type | None]) -> str | None:
+        with self._timing():
+            key = self.cache.key(cls) if self.cache is not None else None
+            if key is not None and (schema := self.cache.get(key)) is not None:  # ty: ignore[possibly-missing-attribute]
+                self._count("schema_cache_hits")
+                return schema
+            if (obj := load()) is None:
+                self._count("schema_failures")
+                return None
+            try:
+                schema = common._json_schema(obj)  # ty: ignore[invalid-argument-type]
+            except Exception as exc:  # noqa: BLE001
+                # Schema generation can fail and raise Pydantic errors.
+                _logger.debug(f"Failed to generate schema for {cls.path}: {exc}")
+                self._count("schema_failures")
+                return None
+            self._count("schemas")
+            if key is not None:
+                self.cache.set(key, schema)  # ty: ignore[possibly-missing-attribute]
+            return schema
+
+    def _import(self, cls: Class) -> type | None:
+        self._count("imports")
+        try:
+            return dynamic_import(cls.path, import_paths=_import_paths(cls))  # ty: ignore[invalid-argument-type]
+        except ImportError:
+            _logger.debug(f"Could not import class {cls.path} for JSON schema")
+            return None
+
+    def from_object(self, obj: type, cls: Class) -> None:
+        """Prepare the schema of an already imported model.
+
+        Parameters:
+            obj: The Pydantic model.
+            cls: The Griffe class representing the Pydantic model.
+        """
+        if self.batch is not None:
+            self._install(cls, self.batch.add(cls, lambda: obj))
+        else:
+            self._install(cls, _LazySchema(partial(self._compute, cls, lambda: obj)))
+
+    def from_class(self, cls: Class) -> None:
+        """Prepare the schema of a statically analyzed model, which will be imported.
+
+        When using worker processes, the model is queued,
+        and its schema is computed when calling `finish`.
+
+        Parameters:
+            cls: The Griffe class representing the Pydantic model.
+        """
+        if self.batch is not None:
+            self._install(cls, self.batch.add(cls, partial(self._import, cls)))
+            return
+        schema = _LazySchema(partial(self._compute, cls, partial(self._import, cls)))
+        self._install(cls, schema)
+        if self.workers > 1:
+            self._jobs.append((cls, schema))
+
+    def finish(self) -> None:
+        """Run queued jobs in worker processes."""
+        with self._timing():
+            self._finish()
+
+    def _finish(self) -> None:
+        jobs: list[tuple[Class, _LazySchema, str | None]] = []
+        for cls, schema in self._jobs:
+            key = self.cache.key(cls) if self.cache is not None else None
+            if key is not None and (cached_schema := self.cache.get(key)) is not None:  # ty: ignore[possibly-missing-attribute]
+                schema._set(cached_schema)
+                self._count("schema_cache_hits")
+            else:
+                jobs.append((cls, schema, key))
+        self._jobs = []
+        if jobs:
+            if self.stats is not None:
+                self.stats.imports += len(jobs)
+            chunksize = max(1, len(jobs) // (self.workers * 4))
+            # Spawn fresh interpreters rather than forking a process that may run threads.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                results = executor.map(
+                    _generate_schema,
+                    [cls.path for cls, _, _ in jobs],
+                    [_import_paths(cls) for cls, _, _ in jobs],
+                    chunksize=chunksize,
+                )
+                for (_, schema, key), (json_schema, error) in zip(jobs, results, strict=True):
+                    if error is not None:
+                        _logger.debug(error)
+                        self._count("schema_failures")
+                    else:
+                        self._count("schemas")
+                    schema._set(json_schema)
+                    if key is not None and json_schema is not None:
+                        self.cache.set(key, json_schema)  # ty: ignore[possibly-missing-attribute]
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import ast
+from typing import TYPE_CHECKING, Any
+
+from griffe import (
+    AliasResolutionError,
+    CyclicAliasError,
+    Docstring,
+    Expr,
+    ExprName,
+    Kind,
+    json_decoder,
+)
+
+from griffe_pydantic._internal import common
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from griffe import Alias, Attribute, Class, Function, Module, Object
+
+
+def _encode_value(value: Any) -> Any:
+    """Encode a value (Griffe expression, source string or Python object) as JSON-compatible data.
+
+    Parameters:
+        value: The value to encode.
+
+    Returns:
+        JSON-compatible data.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, Expr):
+        return {"expr": value.as_dict()}
+    value_repr = repr(value)
+    try:
+        ast.literal_eval(value_repr)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return {"repr": value_repr}
+    return {"literal": value_repr}
+
+
+def _decode_expression(data: Any) -> Any:
+    # Decode bottom-up, like `json.loads(..., object_hook=json_decoder)` would.
+    if isinstance(data, list):
+        return [_decode_expression(item) for item in data]
+    if isinstance(data, dict):
+        return json_decoder({key: _decode_expression(value) for key, value in data.items()})
+    return data
+
+
+def _attach_parent(expr: Expr, parent: Module | Class) -> None:
+    # Names at the start of attribute chains are linked to the scope they were written in,
+    # so that they can be resolved again.
+    for element in expr.iterate(flat=True):
+        if isinstance(element, ExprName) and element.parent is None:
+            element.parent = parent
+
+
+def _decode_value(data: Any, parent: Module | Class) -> Any:
+    """Decode a value previously encoded with `_encode_value`.
+
+    Parameters:
+        data: The encoded value.
+        parent: The scope in which expressions were written.
+
+    Returns:
+        The decoded value.
+    """
+    if not isinstance(data, dict):
+        return data
+    if "expr" in data:
+        expr = _decode_expression(data["expr"])
+        _attach_parent(expr, parent)
+        return expr
+    if "literal" in data:
+        return ast.literal_eval(data["literal"])
+    return data["repr"]
+
+
+def _resolve(obj: Object | Alias) -> Object | None:
+    try:
+        return obj.final_target if obj.is_alias else obj  # ty: ignore[invalid-return-type]
+    except (AliasResolutionError, CyclicAliasError):
+        return None
+
+
+def _iter_models(obj: Module | Class) -> Iterator[Class]:
+    """Yield the processed models declared in a module or class, nested models included.
+
+    Parameters:
+        obj: A Griffe module or class.
+
+    Yields:
+        Griffe classes labeled as Pydantic models.
+    """
+    for cls in obj.classes.values():
+        if not cls.is_alias and "pydantic-model" in cls.labels:
+            yield cls
+            yield from _iter_models(cls)
+
+
+def _dump_class(cls: Class) -> dict[str, Any]:
+    data: dict[str, Any] = {"labels": sorted(cls.labels)}
+    if (config := cls.extra[common._self_namespace].get("config")) is not None:
+        data["config"] = {key: _encode_value(value) for key, value in config.items()}
+    return data
+
+
+def _dump_attribute(attr: Attribute) -> dict[str, Any]:
+    if "pydantic-field" not in attr.labels:
+        return {}
+    extra = attr.extra[common._self_namespace]
+    data: dict[str, Any] = {
+        "labels": sorted(attr.labels),
+        "value": _encode_value(attr.value),
+        "annotation": _encode_value(attr.annotation),
+        "docstring": attr.docstring.value if attr.docstring else None,
+        "constraints": {key: _encode_value(value) for key, value in extra.get("constraints", {}).items()},
+    }
+    if validators := extra.get("validators"):
+        data["validators"] = [validator.path for validator in validators]
+    return data
+
+
+def _dump_function(func: Function) -> dict[str, Any]:
+    if "pydantic-validator" not in func.labels:
+        return {}
+    extra = func.extra[common._self_namespace]
+    data: dict[str, Any] = {"labels": sorted(func.labels), "fields": extra.get("fields", [])}
+    if (targets := extra.get("targets")) is not None:
+        data["targets"] = [target.path for target in targets]
+    return data
+
+
+def _dump_module(mod: Module) -> dict[str, dict[str, Any]]:
+    """Dump the Pydantic metadata of the models declared in a module.
+
+    Members of the models (inherited ones included) are dumped too,
+    keyed by their canonical path, and with empty data when they were not
+    identified as fields or validators.
+
+    Parameters:
+        mod: A Griffe module.
+
+    Returns:
+        Plain data, keyed by canonical paths.
+    """
+    objects: dict[str, dict[str, Any]] = {}
+    for cls in _iter_models(mod):
+        objects[cls.canonical_path] = _dump_class(cls)
+        for member in cls.all_members.values():
+            if (target := _resolve(member)) is None:
+                continue
+            if target.kind is Kind.ATTRIBUTE:
+                objects[target.canonical_path] = _dump_attribute(target)  # ty: ignore[invalid-argument-type]
+            elif target.kind is Kind.FUNCTION:
+                objects[target.canonical_path] = _dump_function(target)  # ty: ignore[invalid-argument-type]
+    return objects
+
+
+def _load_objects(mod: Module, objects: dict[str, dict[str, Any]]) -> list[Object]:
+    """Apply previously dumped Pydantic metadata onto Griffe objects.
+
+    Everything is decoded before any object is modified,
+    so that invalid data leaves the objects untouched.
+
+    Parameters:
+        mod: The Griffe module the data was dumped from.
+        objects: Plain data, keyed by canonical paths.
+
+    Raises:
+        KeyError: When a path cannot be found in the modules collection.
+
+    Returns:
+        The Griffe objects the data was applied to.
+    """
+    collection = mod.modules_collection
+    updates: list[tuple[Object, Callable[[], None]]] = []
+    for path, data in objects.items():
+        obj = _resolve(collection[path])
+        if obj is None:
+            raise KeyError(path)
+        updates.append((obj, _decode_object(obj, data, collection)))
+    for _, update in updates:
+        update()
+    for obj, _ in updates:
+        if obj.kind is Kind.CLASS and "pydantic-model" in obj.labels:
+            common._link_validators(obj)  # ty: ignore[invalid-argument-type]
+    return [obj for obj, _ in updates]
+
+
+def _decode_object(obj: Object, data: dict[str, Any], collection: Any) -> Callable[[], None]:
+    if not data:
+        return lambda: None
+
+    extra = obj.extra[common._self_namespace]
+    labels = set(data["labels"])
+
+    if obj.kind is Kind.CLASS:
+        config = {key: _decode_value(value, obj) for key, value in data["config"].items()} if "config" in data else None  # ty: ignore[invalid-argument-type]
+
+        def _update_class() -> None:
+            obj.labels = labels
+            if config is not None:
+                extra["config"] = config
+            common._process_class(obj)  # ty: ignore[invalid-argument-type]
+
+        return _update_class
+
+    parent = obj.parent
+    if obj.kind is Kind.FUNCTION:
+        fields = data["fields"]
+        targets = [collection[path] for path in data["targets"]] if "targets" in data else None
+
+        def _update_function() -> None:
+            obj.labels = labels
+            extra["fields"] = fields
+            if targets is not None:
+                extra["targets"] = targets
+
+        return _update_function
+
+    value = _decode_value(data["value"], parent)  # ty: ignore[invalid-argument-type]
+    annotation = _decode_value(data["annotation"], parent)  # ty: ignore[invalid-argument-type]
+    constraints = {key: _decode_value(value, parent) for key, value in data["constraints"].items()}  # ty: ignore[invalid-argument-type]
+    validators = [collection[path] for path in data["validators"]] if "validators" in data else None
+
+    def _update_attribute() -> None:
+        obj.labels = labels
+        obj.value = value  # ty: ignore[unresolved-attribute]
+        obj.annotation = annotation  # ty: ignore[unresolved-attribute]
+        extra["constraints"] = constraints
+        if validators is not None:
+            extra["validators"] = validators
+        if not obj.docstring and data["docstring"]:
+            obj.docstring = Docstring(data["docstring"], parent=obj)
+
+    return _update_attribute
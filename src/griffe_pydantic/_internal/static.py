@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import ast
-import sys
+from collections import defaultdict, deque
+from functools import partial
 from typing import TYPE_CHECKING
 
 from griffe import (
     Alias,
+    AliasResolutionError,
     Attribute,
     Class,
+    CyclicAliasError,
     Docstring,
     Expr,
     ExprCall,
@@ -18,14 +21,20 @@ from griffe import (
     Function,
     Kind,
     Module,
-    dynamic_import,
     get_logger,
 )
 
-from griffe_pydantic._internal import common
+from griffe_pydantic._internal import common, serialization
+from griffe_pydantic._internal.stats import ExtensionStats
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from collections.abc import Callable, Iterator
+    from concurrent.futures import Executor
+
+    from griffe import ModulesCollection
+
+    from griffe_pydantic._internal.cache import _AnalysisCache
+    from griffe_pydantic._internal.schema import _SchemaGenerator
 
 
 _logger = get_logger("griffe_pydantic")
@@ -60,22 +69,282 @@ def _extract_description(description: Expr | str) -> str | None:
     return None
 
 
-def _inherits_pydantic(cls: Class) -> bool:
+_pydantic_bases = frozenset(("pydantic.BaseModel", "pydantic.main.BaseModel"))
+
+
+def _inherits_pydantic(
+    cls: Class,
+    ancestry: dict[str, bool] | None = None,
+    bases: frozenset[str] = _pydantic_bases,
+) -> bool:
     """Tell whether a class inherits from a Pydantic model.
 
+    Each class is classified once: results are memoized by canonical path,
+    and parent classes reuse them, making detection linear in the number of classes.
+
     Parameters:
         cls: A Griffe class.
+        ancestry: Memoized results, shared across calls.
+        bases: The paths of the base classes of Pydantic models.
 
     Returns:
         True/False.
     """
+    if ancestry is None:
+        ancestry = {}
+    path = cls.canonical_path
+    if (inherits := ancestry.get(path)) is not None:
+        return inherits
+
+    # Guard against inheritance cycles.
+    ancestry[path] = False
     for base in cls.bases:
         if isinstance(base, (ExprName, Expr)):
             base = base.canonical_path  # noqa: PLW2901
-        if base in {"pydantic.BaseModel", "pydantic.main.BaseModel"}:
-            return True
+        if base in bases:
+            inherits = True
+            break
+    else:
+        inherits = any(
+            _inherits_pydantic(parent_class, ancestry, bases)  # ty: ignore[invalid-argument-type]
+            for parent_class in cls.resolved_bases
+            if parent_class.is_class
+        )
+    ancestry[path] = inherits
+    return inherits
+
+
+def _iter_classes(obj: Module | Class) -> Iterator[Class]:
+    for member in obj.members.values():
+        if member.is_alias:
+            continue
+        if member.is_class:
+            yield member  # ty: ignore[invalid-yield]
+        if member.is_module or member.is_class:
+            yield from _iter_classes(member)  # ty: ignore[invalid-argument-type]
+
+
+class _Discovery:
+    """Models discovered top-down in a package."""
+
+    def __init__(self, models: set[str], modules: dict[str, list[Class]]) -> None:
+        self.models = models
+        """Canonical paths of all the discovered models, in all loaded packages."""
+        self.modules = modules
+        """Models declared at the top level of each module of the package, by module path."""
+
+
+class _SubclassIndex:
+    """Index of the direct subclasses of each class, built once per loader, and walked from the base classes of Pydantic models.
+
+    Classes are indexed by the canonical paths of their bases, as written.
+    Paths that are not the canonical path of an indexed class (imported aliases, classes of packages
+    not loaded yet, external classes) are resolved once per distinct path, like
+    [`resolved_bases`][griffe.Class.resolved_bases] does, and retried while they cannot be resolved,
+    once the packages they belong to are loaded.
+    """
 
-    return any(_inherits_pydantic(parent_class) for parent_class in cls.mro())
+    def __init__(self, collection: ModulesCollection, bases: frozenset[str] = _pydantic_bases) -> None:
+        """Initialize the index.
+
+        Parameters:
+            collection: The modules collection of the loader.
+            bases: The paths of the base classes of Pydantic models.
+        """
+        self._collection = collection
+        self._bases = bases
+        self._subclasses: dict[str, list[Class]] = defaultdict(list)
+        self._classes: set[str] = set()
+        self._aliases: dict[str, str] = {}
+        self._unresolved: set[str] = set()
+
+    def _add(self, pkg: Module) -> list[Class]:
+        classes = list(_iter_classes(pkg))
+        paths: set[str] = set()
+        for cls in classes:
+            self._classes.add(cls.canonical_path)
+            for base in cls.bases:
+                path = base.canonical_path if isinstance(base, Expr) else base
+                path = self._aliases.get(path, path)
+                self._subclasses[path].append(cls)
+                paths.add(path)
+        self._unresolved.update(path for path in paths if path not in self._classes and path not in self._bases)
+        self._resolve()
+        return classes
+
+    def _resolve(self) -> None:
+        loaded = self._collection.members
+        for path in list(self._unresolved):
+            # Only paths in loaded packages can be resolved.
+            if path.split(".", 1)[0] not in loaded:
+                continue
+            try:
+                target = self._collection.get_member(path)
+                if target.is_alias:
+                    target = target.final_target
+            except (AliasResolutionError, CyclicAliasError, KeyError, ValueError):
+                continue
+            self._unresolved.discard(path)
+            if (canonical := target.canonical_path) != path:
+                self._aliases[path] = canonical
+                self._subclasses[canonical].extend(self._subclasses.pop(path))
+
+    def discover(self, pkg: Module, stats: ExtensionStats | None = None) -> _Discovery:
+        """Index the classes of a package, and discover models in all loaded packages.
+
+        Parameters:
+            pkg: The package that was just loaded.
+            stats: Counters to update with the number of models discovered and classes skipped in the package.
+
+        Returns:
+            The discovered models.
+        """
+        classes = self._add(pkg)
+        models: set[str] = set()
+        queue = deque(self._bases)
+        while queue:
+            for cls in self._subclasses.get(queue.popleft(), ()):
+                if (path := cls.canonical_path) not in models:
+                    models.add(path)
+                    queue.append(path)
+
+        modules: dict[str, list[Class]] = defaultdict(list)
+        found = 0
+        for cls in classes:
+            if cls.canonical_path in models:
+                found += 1
+                if cls.parent.is_module:  # ty: ignore[possibly-missing-attribute]
+                    modules[cls.parent.path].append(cls)  # ty: ignore[possibly-missing-attribute]
+        if stats is not None:
+            stats.discovered_models += found
+            stats.skipped_classes += len(classes) - found
+        _logger.debug(f"Discovered {found} models, skipped {len(classes) - found} other classes")
+        return _Discovery(models, modules)
+
+
+def _imported_paths(obj: Module | Class, paths: set[str]) -> None:
+    paths.update(obj.imports.values())
+    for member in obj.members.values():
+        if member.is_alias:
+            # Covers wildcard imports too.
+            paths.add(member.target_path)  # ty: ignore[unresolved-attribute]
+        elif member.is_class:
+            _imported_paths(member, paths)  # ty: ignore[invalid-argument-type]
+
+
+def _iter_modules(obj: Module) -> Iterator[Module]:
+    yield obj
+    for submodule in obj.modules.values():
+        if not submodule.is_alias:
+            yield from _iter_modules(submodule)  # ty: ignore[invalid-argument-type]
+
+
+def _model_providers(collection: ModulesCollection, bases: frozenset[str] = _pydantic_bases) -> set[str]:
+    """Return the paths of the loaded modules that can declare Pydantic models.
+
+    These are the modules importing the base classes of Pydantic models
+    (or their parent modules), and, transitively, the modules importing
+    something from these modules (or their parent packages).
+    Classes of other modules cannot inherit from Pydantic models.
+
+    Parameters:
+        collection: The modules collection.
+        bases: The paths of the base classes of Pydantic models.
+
+    Returns:
+        Module paths.
+    """
+    # Modules importing each path (`from a.b import c` or `import a.b.c`), and modules importing each path or a child of it.
+    importers: dict[str, set[str]] = defaultdict(set)
+    child_importers: dict[str, set[str]] = defaultdict(set)
+    for package in collection.members.values():
+        if package.is_alias:
+            continue
+        for mod in _iter_modules(package):  # ty: ignore[invalid-argument-type]
+            paths: set[str] = set()
+            _imported_paths(mod, paths)
+            for path in paths:
+                importers[path].add(mod.path)
+                parts = path.split(".")
+                for index in range(1, len(parts) + 1):
+                    child_importers[".".join(parts[:index])].add(mod.path)
+
+    def _dependents(path: str) -> set[str]:
+        # Modules importing the object at this path, one of its children, or one of its parents.
+        dependents = set(child_importers.get(path, ()))
+        parts = path.split(".")
+        for index in range(1, len(parts)):
+            dependents.update(importers.get(".".join(parts[:index]), ()))
+        return dependents
+
+    providers: set[str] = set()
+    queue = deque(bases)
+    while queue:
+        for dependent in _dependents(queue.popleft()):
+            if dependent not in providers:
+                providers.add(dependent)
+                queue.append(dependent)
+    return providers
+
+
+class _ParallelRun:
+    """Analysis of model members, deferred while walking a package, and run in a pool of threads.
+
+    Walking the package (detecting models, assigning members to the first model seen,
+    looking up the cache) stays serial, and steps depending on the analysis of members
+    (linking validators, storing results in the cache) are run afterwards, in the same order,
+    so that results are identical to a serial run.
+    Members are analyzed in batches, one per module declaring the models they were assigned to.
+    """
+
+    def __init__(self, executor: Executor, stats: ExtensionStats | None = None) -> None:
+        """Initialize the run.
+
+        Parameters:
+            executor: A pool of threads.
+            stats: Stats to update.
+        """
+        self.executor = executor
+        """A pool of threads."""
+        self.stats = stats
+        """Stats to update."""
+        self._batches: dict[str, list[Callable[[ExtensionStats], None]]] = {}
+        self._steps: list[Callable[[], None]] = []
+
+    def defer(self, cls: Class, task: Callable[[ExtensionStats], None]) -> None:
+        """Defer the analysis of a member.
+
+        Parameters:
+            cls: The model the member was assigned to.
+            task: The analysis, accepting stats to update.
+        """
+        self._batches.setdefault(cls.module.path, []).append(task)
+
+    def then(self, step: Callable[[], None]) -> None:
+        """Add a step to run once pending analyses are complete.
+
+        Parameters:
+            step: The step.
+        """
+        self._steps.append(step)
+
+    def flush(self) -> None:
+        """Run pending analyses in threads, then the following steps in order."""
+        batches, self._batches = list(self._batches.values()), {}
+        for batch_stats in self.executor.map(_run_batch, batches):
+            if self.stats is not None:
+                self.stats._add(batch_stats)
+        steps, self._steps = self._steps, []
+        for step in steps:
+            step()
+
+
+def _run_batch(tasks: list[Callable[[ExtensionStats], None]]) -> ExtensionStats:
+    # Each batch counts in its own stats, merged afterwards, to avoid sharing them across threads.
+    stats = ExtensionStats()
+    for task in tasks:
+        task(stats)
+    return stats
 
 
 def _pydantic_validator(func: Function) -> ExprCall | None:
@@ -96,12 +365,25 @@ def _pydantic_validator(func: Function) -> ExprCall | None:
     return None
 
 
-def _process_attribute(attr: Attribute, cls: Class, *, processed: set[str]) -> None:
+def _process_attribute(
+    attr: Attribute,
+    cls: Class,
+    *,
+    processed: set[str],
+    stats: ExtensionStats | None = None,
+    run: _ParallelRun | None = None,
+) -> None:
     """Handle Pydantic fields."""
-    if attr.canonical_path in processed:
+    if common._object_path(attr) in processed:
         return
-    processed.add(attr.canonical_path)
+    processed.add(common._object_path(attr))
+    if run is not None:
+        run.defer(cls, partial(_analyze_attribute, attr, cls))
+    else:
+        _analyze_attribute(attr, cls, stats)
+
 
+def _analyze_attribute(attr: Attribute, cls: Class, stats: ExtensionStats | None = None) -> None:
     # Properties are not fields.
     if "property" in attr.labels:
         return
@@ -184,6 +466,8 @@ def _process_attribute(attr: Attribute, cls: Class, *, processed: set[str]) -> N
         cls.extra[common._self_namespace]["config"] = config
         return
 
+    if stats is not None:
+        stats.fields += 1
     attr.labels.add("pydantic-field")
     attr.labels.discard("class-attribute")
     attr.labels.discard("instance-attribute")
@@ -200,78 +484,265 @@ def _process_attribute(attr: Attribute, cls: Class, *, processed: set[str]) -> N
             _logger.debug(f"Could not parse description of field '{attr.path}' as literal, skipping")
 
 
-def _process_function(func: Function, cls: Class, *, processed: set[str]) -> None:
+def _process_function(
+    func: Function,
+    cls: Class,
+    *,
+    processed: set[str],
+    stats: ExtensionStats | None = None,
+    run: _ParallelRun | None = None,
+) -> None:
     """Handle Pydantic field validators."""
-    if func.canonical_path in processed:
+    if common._object_path(func) in processed:
         return
-    processed.add(func.canonical_path)
+    processed.add(common._object_path(func))
+    if run is not None:
+        run.defer(cls, partial(_analyze_function, func))
+    else:
+        _analyze_function(func, stats)
+
 
+def _analyze_function(func: Function, stats: ExtensionStats | None = None) -> None:
     if isinstance(func, Alias):
         _logger.debug(f"Cannot yet process {func}")
         return
 
     if decorator := _pydantic_validator(func):
+        if stats is not None:
+            stats.validators += 1
         fields = [ast.literal_eval(field) for field in decorator.arguments if isinstance(field, str)]
-        common._process_function(func, cls, fields)
+        common._process_function(func, fields)
 
 
-def _process_class(cls: Class, *, processed: set[str], schema: bool = False) -> None:
+def _process_class(
+    cls: Class,
+    *,
+    processed: set[str],
+    schemas: _SchemaGenerator | None = None,
+    ancestry: dict[str, bool] | None = None,
+    bases: frozenset[str] = _pydantic_bases,
+    stats: ExtensionStats | None = None,
+    run: _ParallelRun | None = None,
+    discovery: _Discovery | None = None,
+) -> None:
     """Finalize the Pydantic model data."""
-    if cls.canonical_path in processed:
+    if common._object_path(cls) in processed:
         return
 
-    if not _inherits_pydantic(cls):
+    if discovery is not None:
+        if stats is not None:
+            stats.classes_scanned += 1
+        inherits = cls.canonical_path in discovery.models
+    elif stats is None:
+        inherits = _inherits_pydantic(cls, ancestry, bases)
+    else:
+        if ancestry is None:
+            ancestry = {}
+        stats.classes_scanned += 1
+        classified = len(ancestry)
+        inherits = _inherits_pydantic(cls, ancestry, bases)
+        stats.ancestry_checks += len(ancestry) - classified
+    if not inherits:
         return
 
-    processed.add(cls.canonical_path)
+    processed.add(common._object_path(cls))
 
     common._process_class(cls)
+    if stats is not None:
+        stats.models += 1
 
-    if schema:
-        import_path: Path | list[Path] = cls.package.filepath
-        if isinstance(import_path, list):
-            import_path = import_path[-1]
-        if import_path.name == "__init__.py":
-            import_path = import_path.parent
-        import_path = import_path.parent
-        try:
-            true_class = dynamic_import(cls.path, import_paths=[import_path, *sys.path])
-        except ImportError:
-            _logger.debug(f"Could not import class {cls.path} for JSON schema")
-            return
-        try:
-            cls.extra[common._self_namespace]["schema"] = common._json_schema(true_class)
-        except Exception as exc:  # noqa: BLE001
-            # Schema generation can fail and raise Pydantic errors.
-            _logger.debug("Failed to generate schema for %s: %s", cls.path, exc)
+    if schemas is not None:
+        schemas.from_class(cls)
 
     for member in cls.all_members.values():
         kind = member.kind
         if kind is Kind.ATTRIBUTE:
-            _process_attribute(member, cls, processed=processed)  # ty: ignore[invalid-argument-type]
+            _process_attribute(member, cls, processed=processed, stats=stats, run=run)  # ty: ignore[invalid-argument-type]
         elif kind is Kind.FUNCTION:
-            _process_function(member, cls, processed=processed)  # ty: ignore[invalid-argument-type]
+            _process_function(member, cls, processed=processed, stats=stats, run=run)  # ty: ignore[invalid-argument-type]
         elif kind is Kind.CLASS:
-            _process_class(member, processed=processed, schema=schema)  # ty: ignore[invalid-argument-type]
+            _process_class(
+                member,  # ty: ignore[invalid-argument-type]
+                processed=processed,
+                schemas=schemas,
+                ancestry=ancestry,
+                bases=bases,
+                stats=stats,
+                run=run,
+                discovery=discovery,
+            )
+
+    if run is not None:
+        run.then(partial(common._link_validators, cls))
+    else:
+        common._link_validators(cls)
+
+
+def _load_cached_module(
+    mod: Module,
+    *,
+    processed: set[str],
+    cache: _AnalysisCache | None = None,
+    schemas: _SchemaGenerator | None = None,
+    stats: ExtensionStats | None = None,
+) -> tuple[bool, str | None]:
+    """Apply the cached analysis of a module, if any.
+
+    Returns:
+        Whether the cached analysis was applied, and the cache key of the module
+            (none when its analysis cannot be cached).
+    """
+    # Only static analysis results are cached, dynamic analysis already happened at this point.
+    key = cache.key(mod) if cache is not None and mod.analysis == "static" else None
+    if key is None or (objects := cache.load(mod, key)) is None:  # ty: ignore[possibly-missing-attribute]
+        return False, key
+    _logger.debug(f"Using cached analysis of module {mod.path}")
+    processed.update(common._object_path(obj) for obj in objects)
+    models = list(serialization._iter_models(mod))
+    if stats is not None:
+        stats.analysis_cache_hits += 1
+        stats.models += len(models)
+    if schemas is not None:
+        for cls in models:
+            schemas.from_class(cls)
+    return True, key
+
+
+def _load_cached_modules(
+    mod: Module,
+    *,
+    processed: set[str],
+    cache: _AnalysisCache,
+    schemas: _SchemaGenerator | None = None,
+    stats: ExtensionStats | None = None,
+    providers: set[str] | None = None,
+) -> dict[str, str | None]:
+    """Apply the cached analyses of the modules of a package, before analyzing the other modules.
+
+    Used with parallel runs: cached results can overwrite objects whose analysis is pending,
+    so they are all applied before any analysis is deferred, and the run is flushed once.
+    Modules are walked like in `_process_module`.
+
+    Returns:
+        The cache keys of the modules that were not found in the cache, by module path.
+    """
+    keys: dict[str, str | None] = {}
+    stack = [mod]
+    seen: set[str] = set()
+    while stack:
+        current = stack.pop()
+        if common._object_path(current) in processed or current.path in seen:
+            continue
+        seen.add(current.path)
+        if not (providers is not None and current.analysis == "static" and current.path not in providers):
+            applied, key = _load_cached_module(current, processed=processed, cache=cache, schemas=schemas, stats=stats)
+            if not applied:
+                keys[current.path] = key
+        stack.extend(submodule for submodule in current.modules.values() if not submodule.is_alias)
+    return keys
+
+
+def _process_module_classes(
+    mod: Module,
+    *,
+    processed: set[str],
+    cache: _AnalysisCache | None = None,
+    schemas: _SchemaGenerator | None = None,
+    ancestry: dict[str, bool] | None = None,
+    bases: frozenset[str] = _pydantic_bases,
+    stats: ExtensionStats | None = None,
+    run: _ParallelRun | None = None,
+    keys: dict[str, str | None] | None = None,
+    discovery: _Discovery | None = None,
+) -> None:
+    if keys is None:
+        applied, key = _load_cached_module(mod, processed=processed, cache=cache, schemas=schemas, stats=stats)
+    else:
+        # The cache was looked up beforehand: modules missing from the keys were applied from the cache.
+        applied, key = mod.path not in keys, keys.get(mod.path)
+    if not applied:
+        # Only visit discovered models, if any.
+        classes = mod.classes.values() if discovery is None else discovery.modules.get(mod.path, ())
+        for cls in classes:
+            # Don't process aliases, real classes will be processed at some point anyway.
+            if not cls.is_alias:
+                _process_class(
+                    cls,  # ty: ignore[invalid-argument-type]
+                    processed=processed,
+                    schemas=schemas,
+                    ancestry=ancestry,
+                    bases=bases,
+                    stats=stats,
+                    run=run,
+                    discovery=discovery,
+                )
+        if key is not None:
+            if run is not None:
+                run.then(partial(cache.store, mod, key))  # ty: ignore[possibly-missing-attribute]
+            else:
+                cache.store(mod, key)  # ty: ignore[possibly-missing-attribute]
 
 
 def _process_module(
     mod: Module,
     *,
     processed: set[str],
-    schema: bool = False,
+    cache: _AnalysisCache | None = None,
+    schemas: _SchemaGenerator | None = None,
+    ancestry: dict[str, bool] | None = None,
+    bases: frozenset[str] = _pydantic_bases,
+    stats: ExtensionStats | None = None,
+    run: _ParallelRun | None = None,
+    providers: set[str] | None = None,
+    keys: dict[str, str | None] | None = None,
+    discovery: _Discovery | None = None,
 ) -> None:
-    """Handle Pydantic models in a module."""
-    if mod.canonical_path in processed:
+    """Handle Pydantic models in a module.
+
+    When a parallel run is given, the analysis of members is deferred,
+    and must be completed by flushing the run.
+    When model providers are given, classes of statically analyzed modules
+    that are not model providers are skipped.
+    When cache keys are given (see `_load_cached_modules`), the cache is not looked up again.
+    When models were discovered top-down, only they are visited.
+    """
+    if ancestry is None:
+        ancestry = {}
+    if common._object_path(mod) in processed:
         return
-    processed.add(mod.canonical_path)
-
-    for cls in mod.classes.values():
-        # Don't process aliases, real classes will be processed at some point anyway.
-        if not cls.is_alias:
-            _process_class(cls, processed=processed, schema=schema)
+    processed.add(common._object_path(mod))
+
+    if providers is not None and mod.analysis == "static" and mod.path not in providers:
+        # Classes of this module cannot inherit from Pydantic models.
+        if stats is not None:
+            stats.skipped_modules += 1
+    else:
+        _process_module_classes(
+            mod,
+            processed=processed,
+            cache=cache,
+            schemas=schemas,
+            ancestry=ancestry,
+            bases=bases,
+            stats=stats,
+            run=run,
+            keys=keys,
+            discovery=discovery,
+        )
 
     for submodule in mod.modules.values():
         # Same for modules, don't process aliased ones.
         if not submodule.is_alias:
-            _process_module(submodule, processed=processed, schema=schema)
+            _process_module(
+                submodule,
+                processed=processed,
+                cache=cache,
+                schemas=schemas,
+                ancestry=ancestry,
+                bases=bases,
+                stats=stats,
+                run=run,
+                providers=providers,
+                keys=keys,
+                discovery=discovery,
+            )
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+# Timings are updated from the threads reading schemas lazily, and from worker threads.
+_timings_lock = Lock()
+
+
+@dataclass
+class ExtensionStats:
+    """Timings and counters of the Pydantic extension.
+
+    Stats accumulate over all the packages handled by an extension instance.
+    They are collected separately for each loader, and aggregated on read.
+    They are available as [`PydanticExtension.stats`][griffe_pydantic.PydanticExtension.stats].
+    """
+
+    classes_scanned: int = 0
+    """Number of classes scanned during static analysis."""
+    skipped_modules: int = 0
+    """Number of modules whose classes were not scanned, since they cannot declare models (see the `prefilter` option)."""
+    ancestry_checks: int = 0
+    """Number of classes whose ancestry was checked to detect models."""
+    discovered_models: int = 0
+    """Number of models discovered top-down (see the `discovery` option)."""
+    skipped_classes: int = 0
+    """Number of classes that were not visited, since top-down discovery did not reach them."""
+    models: int = 0
+    """Number of detected models."""
+    fields: int = 0
+    """Number of processed fields."""
+    validators: int = 0
+    """Number of processed validators."""
+    analysis_cache_hits: int = 0
+    """Number of modules whose analysis was reused from the cache."""
+    imports: int = 0
+    """Number of models imported to generate their schema."""
+    schemas: int = 0
+    """Number of generated schemas."""
+    schema_failures: int = 0
+    """Number of models whose schema could not be imported or generated."""
+    schema_cache_hits: int = 0
+    """Number of schemas reused from the cache."""
+    timings: dict[str, float] = field(default_factory=dict)
+    """Wall time spent in each phase, in seconds.
+
+    Phases are `dynamic` (models found during dynamic analysis), `discovery` (top-down model discovery),
+    `static` (static analysis) and `schemas` (schema generation, including lazy generation when schemas are read).
+    """
+
+    def _add(self, other: ExtensionStats) -> None:
+        for stat in fields(self):
+            if stat.name == "timings":
+                with _timings_lock:
+                    for phase, seconds in other.timings.items():
+                        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+            else:
+                setattr(self, stat.name, getattr(self, stat.name) + getattr(other, stat.name))
+
+    @contextmanager
+    def _timing(self, phase: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            with _timings_lock:
+                self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+
+    def summary(self) -> str:
+        """Return a one-line summary of the stats.
+
+        Returns:
+            A summary.
+        """
+        counters = (
+            f"{self.classes_scanned} classes scanned, {self.skipped_modules} modules skipped, "
+            f"{self.ancestry_checks} ancestry checks, {self.discovered_models} discovered models, "
+            f"{self.skipped_classes} skipped classes, "
+            f"{self.models} models, {self.fields} fields, {self.validators} validators, "
+            f"{self.analysis_cache_hits} cached modules, {self.imports} imports, {self.schemas} schemas, "
+            f"{self.schema_failures} schema failures, {self.schema_cache_hits} cached schemas"
+        )
+        with _timings_lock:
+            timings = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in self.timings.items())
+        return f"{counters} ({timings})" if timings else counters
@@ -0,0 +1,112 @@
+"""Tests for the CLI."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from griffe import temporary_pypackage
+
+from griffe_pydantic import main
+from griffe_pydantic._internal import debug
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Models are exported to JSON files, and unchanged models are skipped on re-runs."""
+    modules = {
+        "__init__.py": "",
+        "models.py": "from pydantic import BaseModel, Field\n\nclass Model(BaseModel):\n    a: int = Field(0, ge=0)\n",
+        "other.py": "from pydantic import BaseModel\n\nclass Other(BaseModel):\n    b: str = ''\n",
+    }
+    output = tmp_path / "output"
+    with temporary_pypackage("cli_package", modules) as package:
+        args = ["cli_package", "-o", str(output), "-s", str(package.tmpdir), "-c", str(tmp_path / "cache")]
+        assert main(args) == 0
+        assert "2 models exported, 0 unchanged, 0 removed" in capsys.readouterr().out
+        record = json.loads(output.joinpath("cli_package.models.Model.json").read_text())
+        assert record["fields"]["a"]["constraints"] == {"ge": 0}
+        assert record["fields"]["a"]["default"] == 0
+        assert record["schema"]["title"] == "Model"
+
+        package.path.joinpath("other.py").write_text("")
+        assert main(args) == 0
+        assert "0 models exported, 1 unchanged, 1 removed" in capsys.readouterr().out
+    assert not output.joinpath("cli_package.other.Other.json").exists()
+
+
+def test_showing_progress(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Progress is shown while loading packages, generating schemas and exporting models."""
+    modules = {"__init__.py": "from pydantic import BaseModel\n\nclass A(BaseModel):\n    a: int = 0\n"}
+    with temporary_pypackage("cli_progress", modules) as package:
+        args = ["cli_progress", "-o", str(tmp_path / "output"), "-s", str(package.tmpdir)]
+        assert main([*args, "--progress"]) == 0
+    err = capsys.readouterr().err
+    assert "Loading [1/1] cli_progress" in err
+    assert "Generating schemas [1/1] cli_progress.A" in err
+    assert "Exporting [1/1] cli_progress.A" in err
+
+    with temporary_pypackage("cli_progress_jsonl", modules) as package:
+        args = ["cli_progress_jsonl", "--jsonl", "-o", str(tmp_path / "records.jsonl"), "-s", str(package.tmpdir)]
+        assert main([*args, "--progress"]) == 0
+    assert "Exporting [1/1] cli_progress_jsonl.A" in capsys.readouterr().err
+
+
+def test_exporting_models_with_failed_schemas_again(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Models whose schema could not be generated are not recorded as exported, and are exported again."""
+    monkeypatch.chdir(tmp_path)
+    modules = {
+        "__init__.py": "from pydantic import BaseModel\n\nclass A(BaseModel):\n    a: int = 0\n",
+        "broken.py": "from pydantic import BaseModel\n\nraise RuntimeError\n\nclass B(BaseModel):\n    b: int = 0\n",
+    }
+    output = tmp_path / "output"
+    with temporary_pypackage("cli_failures", modules) as package:
+        args = ["cli_failures", "-o", str(output), "-s", str(package.tmpdir)]
+        assert main(args) == 0
+        assert "2 models exported, 0 unchanged, 0 removed, 1 incomplete" in capsys.readouterr().out
+        assert json.loads(output.joinpath("cli_failures.broken.B.json").read_text())["schema"] is None
+        assert main(args) == 0
+        assert "1 models exported, 1 unchanged, 0 removed, 1 incomplete" in capsys.readouterr().out
+    manifest = json.loads(output.joinpath("manifest.json").read_text())
+    assert set(manifest["models"]) == {"cli_failures.A"}
+    assert output.joinpath("cli_failures.broken.B.json").exists()
+    # Nothing is cached unless a cache directory is given.
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["output"]
+
+
+def test_show_version(capsys: pytest.CaptureFixture) -> None:
+    """Show version."""
+    with pytest.raises(SystemExit):
+        main(["-V"])
+    captured = capsys.readouterr()
+    assert debug._get_version() in captured.out
+
+
+def test_show_debug_info(capsys: pytest.CaptureFixture) -> None:
+    """Show debug information."""
+    with pytest.raises(SystemExit):
+        main(["--debug-info"])
+    captured = capsys.readouterr().out.lower()
+    assert "python" in captured
+    assert "system" in captured
+
+
+def test_streaming_records(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Records are streamed as JSON Lines."""
+    modules = {
+        "__init__.py": "from pydantic import BaseModel\n\nclass A(BaseModel):\n    a: int = 0\n\nclass B(A):\n    b: int = 0\n",
+    }
+    with temporary_pypackage("cli_jsonl", modules) as package:
+        args = ["cli_jsonl", "--jsonl", "-o", "-", "-s", str(package.tmpdir), "-c", str(tmp_path)]
+        assert main(args) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["path"] for record in records] == ["cli_jsonl.A", "cli_jsonl.B"]
+    assert set(records[1]["fields"]) == {"a", "b"}
+    assert records[1]["schema"]["title"] == "B"
@@ -2,15 +2,41 @@
 
 from __future__ import annotations
 
+import gc
+import json
 import logging
-from typing import TYPE_CHECKING
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
 import pytest
-from griffe import Extensions, temporary_inspected_package, temporary_visited_package
-
-from griffe_pydantic._internal.extension import PydanticExtension
+from griffe import (
+    Attribute,
+    Class,
+    Extension,
+    Extensions,
+    GriffeLoader,
+    Module,
+    ObjectNode,
+    json_decoder,
+    temporary_inspected_package,
+    temporary_visited_package,
+)
+
+from griffe_pydantic import (
+    ExtensionStats,
+    ModelIndex,
+    PydanticExtension,
+    ValidatorGraph,
+    dump_metadata,
+    iter_model_records,
+    load_metadata,
+)
+from griffe_pydantic._internal import cache, common, schema, serialization, static
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from mkdocstrings_handlers.python import PythonHandler
 
 
@@ -79,7 +105,7 @@ def test_extension(analysis: str) -> None:
         config = package.classes["ExampleModel"].extra["griffe_pydantic"]["config"]
         assert config == {"frozen": False}
 
-        schema = package.classes["ExampleModel"].extra["griffe_pydantic"]["schema"]
+        schema = package.classes["ExampleModel"].extra["griffe_pydantic"]["schema"]()
         assert schema.startswith('{\n  "description"')
 
 
@@ -127,6 +153,324 @@ def test_rendering_model_config_using_configdict(python_handler: PythonHandler)
         python_handler.render(package["Model"], python_handler.get_options({}))  # Assert no errors.
 
 
+def test_rendering_schema(python_handler: PythonHandler) -> None:
+    """Test rendering the JSON schema of a model."""
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True)),
+    ) as package:
+        html = python_handler.render(package["ExampleModel"], python_handler.get_options({}))
+        assert "Show JSON schema:" in html
+
+
+def test_exporting_schemas(python_handler: PythonHandler, tmp_path: Path) -> None:
+    """Exported schemas are written once to files, and linked instead of embedded."""
+    extension = PydanticExtension(schema=True, schema_export_dir=tmp_path, schema_export_url="/site/schemas/")
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(extension),
+    ) as package:
+        html = python_handler.render(package["ExampleModel"], python_handler.get_options({}))
+        url = package["ExampleModel"].extra["griffe_pydantic"]["schema_url"]()
+        assert url == package["ExampleModel"].extra["griffe_pydantic"]["schema_url"]()
+        compact = package["ExampleModel"].extra["griffe_pydantic"]["schema"].compact()
+    assert url.startswith("/site/schemas/")
+    assert f'href="{url}"' in html
+    assert "Show JSON schema:" not in html
+    files = list(tmp_path.iterdir())
+    assert [file.name for file in files] == [url.rsplit("/", 1)[1]]
+    assert files[0].read_text() == compact
+
+
+def test_exporting_schemas_again_after_clean_builds(tmp_path: Path) -> None:
+    """Schema files deleted since they were exported are written again when linked."""
+    extension = PydanticExtension(schema=True, schema_export_dir=tmp_path, schema_export_url="/site/schemas")
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(extension),
+    ) as package:
+        schema_url = package["ExampleModel"].extra["griffe_pydantic"]["schema_url"]
+        url = schema_url()
+        filepath = tmp_path / url.rsplit("/", 1)[1]
+        filepath.unlink()
+        assert schema_url() == url
+        assert filepath.exists()
+
+
+def test_requiring_schema_export_url() -> None:
+    """Exporting schemas requires the URL they are served from, since sites can be served under a path."""
+    with pytest.raises(ValueError, match="schema_export_url"):
+        PydanticExtension(schema=True, schema_export_dir="schemas")
+
+
+def test_caching_rendered_fragments(python_handler: PythonHandler, tmp_path: Path) -> None:
+    """Rendered fragments of unchanged models are reused, and changed models are rendered again."""
+
+    def _render(source: str) -> str:
+        with temporary_visited_package(
+            "package",
+            modules={"__init__.py": source},
+            extensions=Extensions(PydanticExtension(schema=True, cache_dir=tmp_path, fragment_cache=True)),
+        ) as package:
+            return python_handler.render(package["ExampleModel"], python_handler.get_options({}))
+
+    _render(code)
+    fragments = sorted(tmp_path.joinpath("fragments").iterdir())
+    assert len(fragments) == 4
+    _render(code)
+    assert sorted(tmp_path.joinpath("fragments").iterdir()) == fragments
+    for fragment in fragments:
+        fragment.write_text(f"<p>cached {fragment.stem}</p>")
+    assert "<p>cached" in _render(code)
+    assert "<p>cached" not in _render(code.replace("field_without_default", "renamed_field"))
+
+
+def test_caching_rendered_fragments_per_options(python_handler: PythonHandler, tmp_path: Path) -> None:
+    """Fragments are rendered again when handler options change."""
+
+    def _render(options: dict[str, Any]) -> str:
+        with temporary_visited_package(
+            "package",
+            modules={"__init__.py": code},
+            extensions=Extensions(PydanticExtension(schema=True, cache_dir=tmp_path, fragment_cache=True)),
+        ) as package:
+            return python_handler.render(package["ExampleModel"], python_handler.get_options(options))
+
+    _render({})
+    fragments = sorted(tmp_path.joinpath("fragments").iterdir())
+    for fragment in fragments:
+        fragment.write_text(f"<p>cached {fragment.stem}</p>")
+    assert "<p>cached" in _render({})
+    assert "<p>cached" not in _render({"show_root_heading": True})
+    assert len(list(tmp_path.joinpath("fragments").iterdir())) == 2 * len(fragments)
+
+
+def test_caching_rendered_fragments_per_annotation_targets(python_handler: PythonHandler, tmp_path: Path) -> None:
+    """Fragments are rendered again when names used in annotations resolve to other objects."""
+    modules = {
+        "__init__.py": "",
+        "a.py": "class X:\n    pass\n",
+        "b.py": "class X:\n    pass\n",
+        "models.py": "from pydantic import BaseModel\n\nfrom fragpkg.a import X\n\nclass Model(BaseModel):\n    x: X\n",
+    }
+
+    def _render(modules: dict[str, str]) -> str:
+        with temporary_visited_package(
+            "fragpkg",
+            modules=modules,
+            extensions=Extensions(PydanticExtension(cache_dir=tmp_path, fragment_cache=True)),
+        ) as package:
+            return python_handler.render(package["models.Model"], python_handler.get_options({}))
+
+    assert "fragpkg.a.X" in _render(modules)
+    html = _render({**modules, "models.py": modules["models.py"].replace("fragpkg.a", "fragpkg.b")})
+    assert "fragpkg.b.X" in html
+    assert "fragpkg.a.X" not in html
+
+
+def test_not_generating_schemas_of_cached_fragments(python_handler: PythonHandler, tmp_path: Path) -> None:
+    """Schemas are not generated (or read from their cache) when the fragments showing them are cached."""
+
+    def _render() -> ExtensionStats:
+        extension = PydanticExtension(schema=True, cache_dir=tmp_path, fragment_cache=True)
+        with temporary_visited_package(
+            "package",
+            modules={"__init__.py": code},
+            extensions=Extensions(extension),
+        ) as package:
+            python_handler.render(package["ExampleModel"], python_handler.get_options({}))
+        return extension.stats
+
+    assert _render().schemas == 1
+    stats = _render()
+    assert stats.schemas + stats.schema_cache_hits == 0
+
+
+def test_bounding_fragments_kept_in_memory(python_handler: PythonHandler, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Fragments kept in memory are evicted, least recently used first, beyond the maximum size of the cache."""
+    store = cache._MemoryStore()
+    monkeypatch.setattr(cache, "_memory_fragments", store)
+    store.set("old", "a" * 10, 30)
+    store.set("recent", "b" * 10, 30)
+    assert store.get("old") == "a" * 10
+    store.set("new", "c" * 15, 30)
+    assert store.get("recent") is None
+    assert store.get("old") == "a" * 10
+    assert store.size == 25
+
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True, fragment_cache=True, fragment_cache_max_size=1000)),
+    ) as package:
+        python_handler.render(package["ExampleModel"], python_handler.get_options({}))
+    assert 0 < store.size <= 1000
+
+
+def test_sharing_memory_stores_and_stats_across_threads() -> None:
+    """Fragments kept in memory and timings stay consistent when updated from several threads."""
+    store = cache._MemoryStore()
+    stats = ExtensionStats()
+
+    def _update(index: int) -> None:
+        for step in range(200):
+            store.set(f"{index}-{step}", "a" * 10, 500)
+            store.get(f"{index}-{step - 1}")
+            with stats._timing(f"phase{step % 3}"):
+                pass
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_update, range(8)))
+    assert store.size == sum(len(value) for value in store._entries.values()) <= 500
+    assert set(stats.timings) == {"phase0", "phase1", "phase2"}
+
+
+def test_dumping_and_loading_metadata(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Metadata survives a JSON round-trip, and is applied to packages loaded from Griffe dumps or sources."""
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True)),
+    ) as package:
+        metadata = json.loads(json.dumps(dump_metadata(package)))
+        json_schema = package["ExampleModel"].extra["griffe_pydantic"]["schema"]()
+        dump = package.as_json()
+
+    loaded = json.loads(dump, object_hook=json_decoder)
+    load_metadata(loaded, metadata)
+    model = loaded["ExampleModel"]
+    extra = model.extra["griffe_pydantic"]
+    assert "pydantic-model" in model.labels
+    assert set(extra["fields"]()) == {
+        "parent_field",
+        "field_without_default",
+        "field_plain_with_validator",
+        "field_with_validator_and_alias",
+        "field_with_constraints_and_description",
+    }
+    validator = extra["validators"]()["check_max_length_ten"]
+    assert [target.name for target in validator.extra["griffe_pydantic"]["targets"]] == [
+        "field_with_validator_and_alias",
+        "field_plain_with_validator",
+    ]
+    assert str(extra["config"]["frozen"]) == "False"
+    assert extra["schema"]() == json_schema
+
+    metadata_file = tmp_path / "metadata.json"
+    metadata_file.write_text(json.dumps(metadata))
+    extension = PydanticExtension(metadata=metadata_file, fragment_cache=True, log_stats=True)
+    with (
+        caplog.at_level(logging.INFO),
+        temporary_visited_package(
+            "package",
+            modules={"__init__.py": code},
+            extensions=Extensions(extension),
+        ) as package,
+    ):
+        assert "pydantic-model" in package["ExampleModel"].labels
+        assert package["ExampleModel"].extra["griffe_pydantic"]["schema"]() == json_schema
+        assert package.extra["griffe_pydantic"]["fragment_cache"] is not None
+    assert extension.stats.classes_scanned == 0
+    assert any("Stats after package package" in record.message for record in caplog.records)
+
+
+def test_restoring_exported_schema_urls_from_metadata(tmp_path: Path) -> None:
+    """URLs of exported schemas are dumped with the metadata, and schemas are exported again when loading it."""
+    dumped = tmp_path / "dumped"
+    extension = PydanticExtension(schema=True, schema_export_dir=dumped, schema_export_url="/dumped")
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(extension),
+    ) as package:
+        metadata = json.loads(json.dumps(dump_metadata(package)))
+        url = package["ExampleModel"].extra["griffe_pydantic"]["schema_url"]()
+        dump = package.as_json()
+    assert metadata["packages"]["package"]["package.ExampleModel"]["schema_url"] == url
+
+    loaded = json.loads(dump, object_hook=json_decoder)
+    load_metadata(loaded, metadata)
+    assert loaded["ExampleModel"].extra["griffe_pydantic"]["schema_url"]() == url
+
+    metadata_file = tmp_path / "metadata.json"
+    metadata_file.write_text(json.dumps(metadata))
+    exported = tmp_path / "exported"
+    extension = PydanticExtension(metadata=metadata_file, schema_export_dir=exported, schema_export_url="/exported")
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(extension),
+    ) as package:
+        name = url.rsplit("/", 1)[1]
+        assert package["ExampleModel"].extra["griffe_pydantic"]["schema_url"]() == f"/exported/{name}"
+    assert exported.joinpath(name).read_text() == dumped.joinpath(name).read_text()
+
+
+def test_iterating_model_records() -> None:
+    """Records of models are yielded one by one, with their fields, validators, config and optionally schema."""
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True)),
+    ) as package:
+        records = iter_model_records(package)
+        parent = next(records)
+        assert parent["path"] == "package.ExampleParentModel"
+        assert "schema" not in parent
+        record = next(records)
+        assert record["config"] == {"frozen": False}
+        assert record["fields"]["field_with_constraints_and_description"]["constraints"] == {"ge": 0, "le": 100}
+        assert record["fields"]["field_with_validator_and_alias"]["default"] == "FooBar"
+        assert record["fields"]["field_without_default"]["default"] is None
+        assert record["validators"]["check_max_length_ten"]["fields"] == [
+            "package.ExampleModel.field_with_validator_and_alias",
+            "package.ExampleModel.field_plain_with_validator",
+        ]
+        assert next(iter_model_records(package, schema=True))["schema"]["title"] == "ExampleParentModel"
+
+
+def test_querying_model_index() -> None:
+    """Models and fields are indexed by field name, annotation and constraint."""
+    modules = {
+        "__init__.py": "",
+        "models.py": """
+            from pydantic import BaseModel, Field
+
+            class Address(BaseModel):
+                street: str = Field(pattern=r"^\\w+$")
+
+            class Tenant(BaseModel):
+                tenant_id: str
+
+            class Person(Tenant):
+                address: Address
+                previous_addresses: list[Address] = []
+                age: int = Field(0, ge=0)
+        """,
+    }
+    with temporary_visited_package(
+        "indexed",
+        modules=modules,
+        extensions=Extensions(PydanticExtension(index=True)),
+    ) as package:
+        index = package.extra["griffe_pydantic"]["index"]
+        assert isinstance(index, ModelIndex)
+        assert set(index.models) == {"indexed.models.Address", "indexed.models.Tenant", "indexed.models.Person"}
+        assert [model.name for model in index.models_with_field("tenant_id")] == ["Tenant", "Person"]
+        assert [field.path for field in index.fields_named("tenant_id")] == ["indexed.models.Tenant.tenant_id"]
+        assert [model.name for model in index.models_embedding("indexed.models.Address")] == ["Person"]
+        assert [field.name for field in index.fields_annotated_with("indexed.models.Address")] == [
+            "address",
+            "previous_addresses",
+        ]
+        assert [field.path for field in index.fields_constrained_by("pattern")] == ["indexed.models.Address.street"]
+        assert [model.name for model in index.models_constrained_by("ge")] == ["Person"]
+        assert index.models_with_field("unknown") == []
+
+
 def test_not_crashing_on_dynamic_field_description(caplog: pytest.LogCaptureFixture) -> None:
     """Test the extension with dynamic field description."""
     code = """
@@ -252,7 +596,6 @@ def test_annotated_fields() -> None:
     ) as package:
         assert package["Model.a"].is_attribute
         assert package["Model.b"].is_attribute
-        assert "pydantic-field" in package["Model.a"].labels
         assert "pydantic-field" in package["Model.b"].labels
         assert package["Model.a"].docstring.value == "Some description."
         assert package["Model.b"].docstring.value == "Another description."
@@ -387,3 +730,688 @@ def test_field_description_with_annotated_and_dedent() -> None:
         assert package["Model.field1"].docstring is not None
         assert "This is a multiline description." in package["Model.field1"].docstring.value
         assert "With multiple lines." in package["Model.field1"].docstring.value
+
+
+def test_caching_static_analysis(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Cached analysis results are applied back onto unchanged modules."""
+    modules = {
+        "__init__.py": "from pydantic import BaseModel\n\nclass Base(BaseModel):\n    base_field: int = 0\n",
+        "models.py": code,
+    }
+
+    def _load() -> dict:
+        with temporary_visited_package(
+            "package",
+            modules=modules,
+            extensions=Extensions(PydanticExtension(cache_dir=tmp_path)),
+        ) as package:
+            model = package["models.ExampleModel"]
+            field = package["models.ExampleModel.field_with_constraints_and_description"]
+            validator = package["models.ExampleModel.check_max_length_ten"]
+            return {
+                "model_labels": model.labels,
+                "config": model.extra["griffe_pydantic"]["config"],
+                "fields": list(model.extra["griffe_pydantic"]["fields"]()),
+                "field_labels": field.labels,
+                "field_value": str(field.value),
+                "constraints": {
+                    key: str(value) for key, value in field.extra["griffe_pydantic"]["constraints"].items()
+                },
+                "docstring": field.docstring.value,
+                "targets": [target.path for target in validator.extra["griffe_pydantic"]["targets"]],
+                "annotation_path": package["models.ExampleModel.field_without_default"].annotation.canonical_path,
+            }
+
+    first = _load()
+    assert list(tmp_path.joinpath("analysis").iterdir())
+    with caplog.at_level(logging.DEBUG):
+        second = _load()
+    assert any("Using cached analysis of module package.models" in record.message for record in caplog.records)
+    assert first == second
+
+
+def test_caching_schemas(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Cached schemas are reused without importing models."""
+    extension = PydanticExtension(schema=True, cache_dir=tmp_path)
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(extension),
+    ) as package:
+        json_schema = package["ExampleModel"].extra["griffe_pydantic"]["schema"]()
+    assert json_schema
+
+    def _fail_import(*args: object, **kwargs: object) -> None:  # noqa: ARG001
+        raise ImportError
+
+    monkeypatch.setattr(schema, "dynamic_import", _fail_import)
+    extension = PydanticExtension(schema=True, cache_dir=tmp_path)
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(extension),
+    ) as package:
+        assert package["ExampleModel"].extra["griffe_pydantic"]["schema"]() == json_schema
+
+
+def test_evicting_cached_schemas(tmp_path: Path) -> None:
+    """Least recently used schemas are evicted as soon as the cache is full, including when schemas are read lazily."""
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True, cache_dir=tmp_path / "sizes")),
+    ) as package:
+        package["ExampleParentModel"].extra["griffe_pydantic"]["schema"]()
+        package["ExampleModel"].extra["griffe_pydantic"]["schema"]()
+    max_size = max(entry.stat().st_size for entry in tmp_path.joinpath("sizes", "schemas").iterdir())
+
+    extension = PydanticExtension(schema=True, cache_dir=tmp_path, schema_cache_max_size=max_size)
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(extension),
+    ) as package:
+        assert package["ExampleParentModel"].extra["griffe_pydantic"]["schema"]()
+        assert package["ExampleModel"].extra["griffe_pydantic"]["schema"]()
+        entries = list(tmp_path.joinpath("schemas").iterdir())
+        assert len(entries) == 1
+        assert sum(entry.stat().st_size for entry in entries) <= max_size
+        assert package["ExampleModel"].extra["griffe_pydantic"]["schema"].compact() == entries[0].read_text()
+
+
+def test_generating_schemas_in_worker_processes() -> None:
+    """Schemas are generated by worker processes during static analysis."""
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True, schema_workers=2)),
+    ) as package:
+        for name in ("ExampleParentModel", "ExampleModel"):
+            assert package[name].extra["griffe_pydantic"]["schema"]().startswith('{\n  "description"')
+
+
+def test_generating_schemas_lazily(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Schemas are only generated when read, and only once."""
+    calls = []
+    json_schema = common._json_schema
+
+    def _json_schema(model: type) -> str:
+        calls.append(model)
+        return json_schema(model)  # ty: ignore[invalid-argument-type]
+
+    monkeypatch.setattr(common, "_json_schema", _json_schema)
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True)),
+    ) as package:
+        assert not calls
+        schema = package["ExampleModel"].extra["griffe_pydantic"]["schema"]
+        assert schema() == schema()
+        assert len(calls) == 1
+
+
+@pytest.mark.parametrize("orjson", [True, False])
+def test_keeping_schemas_compact(monkeypatch: pytest.MonkeyPatch, orjson: bool) -> None:
+    """Schemas are kept as compact JSON, and only indented when read."""
+    if not orjson:
+        monkeypatch.setattr(common, "_orjson", None)
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True)),
+    ) as package:
+        schema = package["ExampleModel"].extra["griffe_pydantic"]["schema"]
+        assert "\n" not in schema.compact()
+        assert schema.data()["title"] == "ExampleModel"
+        assert schema() == json.dumps(schema.data(), indent=2)
+
+
+@pytest.mark.parametrize("orjson", [True, False])
+def test_keeping_non_finite_floats_and_big_integers_in_schemas(monkeypatch: pytest.MonkeyPatch, orjson: bool) -> None:
+    """Schemas keep `Infinity` defaults and integers above 64 bits, whether `orjson` is installed or not."""
+    if not orjson:
+        monkeypatch.setattr(common, "_orjson", None)
+    code = """
+        from pydantic import BaseModel, Field
+
+        class ExampleModel(BaseModel):
+            limit: float = float("inf")
+            count: int = Field(0, le=2**70)
+    """
+    with temporary_visited_package(
+        "infinite_package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension(schema=True)),
+    ) as package:
+        schema = package["ExampleModel"].extra["griffe_pydantic"]["schema"]
+        assert '"default": Infinity' in schema()
+        assert schema.data()["properties"]["limit"]["default"] == float("inf")
+        assert schema.data()["properties"]["count"]["maximum"] == 2**70
+
+
+def test_generating_schemas_in_batches() -> None:
+    """Schemas of a package are generated together, sharing their definitions, and match standalone schemas."""
+    modules = {
+        "__init__.py": "",
+        "models.py": """
+            from __future__ import annotations
+
+            from pydantic import BaseModel
+
+            class Address(BaseModel):
+                street: str
+
+            class Person(BaseModel):
+                address: Address
+
+            class Company(BaseModel):
+                address: Address
+                employees: list[Person]
+
+            class Node(BaseModel):
+                children: list[Node] = []
+        """,
+    }
+    names = ("Address", "Person", "Company", "Node")
+
+    with temporary_visited_package(
+        "batched",
+        modules=modules,
+        extensions=Extensions(PydanticExtension(schema=True)),
+    ) as package:
+        standalone = {name: package[f"models.{name}"].extra["griffe_pydantic"]["schema"]() for name in names}
+    with temporary_visited_package(
+        "batched",
+        modules=modules,
+        extensions=Extensions(PydanticExtension(schema=True, schema_batch=True)),
+    ) as package:
+        batched = {name: package[f"models.{name}"].extra["griffe_pydantic"]["schema"] for name in names}
+        for name in names:
+            assert batched[name]() == standalone[name]
+    assert batched["Person"].reference() == {"$ref": "#/$defs/Person"}
+    assert batched["Person"].definitions() is batched["Company"].definitions()
+    assert set(batched["Person"].definitions()) == set(names)
+
+
+def test_generating_clashing_batched_definitions_separately() -> None:
+    """Models added to a batch after a generation, whose definitions clash with previous ones, get standalone schemas."""
+    from pydantic import create_model  # noqa: PLC0415
+
+    first = create_model("Item", name=(str, ...))
+    second = create_model("Item", size=(int, ...))
+    batch = schema._SchemaBatch(schema._SchemaGenerator(batch=True))
+    module = Module("clashing")
+    first_schema = batch.add(Class("First", parent=module), lambda: first)
+    assert set(first_schema.data()["properties"]) == {"name"}
+    second_schema = batch.add(Class("Second", parent=module), lambda: second)
+    assert set(second_schema.data()["properties"]) == {"size"}
+    assert second_schema.reference() is None
+    assert set(first_schema.data()["properties"]) == {"name"}
+
+
+def test_caching_batched_schemas_separately(tmp_path: Path) -> None:
+    """Batched schemas, which qualify definitions of models sharing a class name, never replace standalone ones."""
+    modules = {
+        "__init__.py": "",
+        "a.py": "from pydantic import BaseModel\n\nclass Item(BaseModel):\n    name: str\n",
+        "b.py": "from pydantic import BaseModel\n\nclass Item(BaseModel):\n    price: int\n",
+        "c.py": "from pydantic import BaseModel\n\nfrom .a import Item\n\nclass Order(BaseModel):\n    item: Item\n",
+    }
+
+    def _schema(**options: Any) -> dict[str, Any]:
+        with temporary_visited_package(
+            "homonyms",
+            modules=modules,
+            extensions=Extensions(PydanticExtension(schema=True, **options)),
+        ) as package:
+            schemas = {path: package[path].extra["griffe_pydantic"]["schema"].data() for path in ("a.Item", "b.Item")}
+            assert all(schemas.values())
+            return package["c.Order"].extra["griffe_pydantic"]["schema"].data()
+
+    standalone = _schema()
+    assert set(standalone["$defs"]) == {"Item"}
+    batched = _schema(schema_batch=True, cache_dir=tmp_path)
+    assert batched["$defs"] != standalone["$defs"]
+    assert _schema(cache_dir=tmp_path) == standalone
+    assert _schema(schema_batch=True, cache_dir=tmp_path) == batched
+
+
+def test_incremental_analysis(caplog: pytest.LogCaptureFixture) -> None:
+    """Only changed modules and modules inheriting from them are analyzed again."""
+    modules = {
+        "__init__.py": "",
+        "base.py": "from pydantic import BaseModel\n\nclass Base(BaseModel):\n    base_field: int = 0\n",
+        "child.py": "from incremental.base import Base\n\nclass Child(Base):\n    child_field: int = 0\n",
+        "other.py": "from pydantic import BaseModel\n\nclass Other(BaseModel):\n    other_field: int = 0\n",
+    }
+
+    def _load() -> list[str]:
+        caplog.clear()
+        with (
+            caplog.at_level(logging.DEBUG),
+            temporary_visited_package(
+                "incremental",
+                modules=modules,
+                extensions=Extensions(PydanticExtension(incremental=True)),
+            ) as package,
+        ):
+            assert "pydantic-field" in package["child.Child.base_field"].labels
+            assert "pydantic-field" in package["other.Other.other_field"].labels
+        return sorted(
+            record.message.rsplit(" ", 1)[-1]
+            for record in caplog.records
+            if "Using cached analysis of module" in record.message
+        )
+
+    _load()
+    assert _load() == ["incremental", "incremental.base", "incremental.child", "incremental.other"]
+    modules["base.py"] += "    new_field: str = ''\n"
+    assert _load() == ["incremental", "incremental.other"]
+
+
+def test_reusing_extension_across_loaders() -> None:
+    """The same extension instance processes packages loaded by different loaders."""
+    extension = PydanticExtension()
+    for _ in range(2):
+        with temporary_visited_package(
+            "package",
+            modules={"__init__.py": code},
+            extensions=Extensions(extension),
+        ) as package:
+            assert package["ExampleModel"].labels == {"pydantic-model"}
+
+
+def test_memoizing_ancestry_detection() -> None:
+    """Each class of a deep hierarchy is classified once, and results are shared."""
+    lines = ["from pydantic import BaseModel", "class Model0(BaseModel): ...", "class Regular0: ..."]
+    lines.extend(f"class Model{index}(Model{index - 1}): ..." for index in range(1, 30))
+    lines.extend(f"class Regular{index}(Regular{index - 1}): ..." for index in range(1, 30))
+    with temporary_visited_package("package", modules={"__init__.py": "\n".join(lines)}) as package:
+        ancestry: dict[str, bool] = {}
+        assert static._inherits_pydantic(package["Model29"], ancestry)
+        assert not static._inherits_pydantic(package["Regular29"], ancestry)
+        assert len(ancestry) == 60
+        assert all(ancestry[f"package.Model{index}"] for index in range(30))
+        assert not any(ancestry[f"package.Regular{index}"] for index in range(30))
+
+
+def test_ancestry_detection_with_inheritance_cycle() -> None:
+    """Inheritance cycles do not make ancestry detection crash."""
+    code = """
+    class A(B): ...
+    class B(A): ...
+    """
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension()),
+    ) as package:
+        assert not static._inherits_pydantic(package["A"])
+
+
+@pytest.mark.parametrize("discovery", ["bottom-up", "top-down"])
+def test_discovering_models(discovery: str, caplog: pytest.LogCaptureFixture) -> None:
+    """Models are discovered across modules, including subclasses of configured bases."""
+    modules = {
+        "__init__.py": "from package._private import MyModel\n\n__all__ = ['MyModel']",
+        "_private.py": "from pydantic import BaseModel\n\nclass MyModel(BaseModel):\n    field1: str\n",
+        "sub.py": "from package import MyModel\n\nclass SubModel(MyModel):\n    field2: str\n\nclass Regular:\n    attr: int = 0\n",
+        "sql.py": "from sqlmodel import SQLModel\n\nclass Table(SQLModel):\n    id: int\n",
+    }
+    extension = PydanticExtension(discovery=discovery, model_bases=["sqlmodel.SQLModel"])  # ty: ignore[invalid-argument-type]
+    with (
+        caplog.at_level(logging.DEBUG),
+        temporary_visited_package(
+            "package",
+            modules=modules,
+            extensions=Extensions(extension),
+        ) as package,
+    ):
+        assert package["MyModel"].labels == {"pydantic-model"}
+        assert package["sub.SubModel"].labels == {"pydantic-model"}
+        assert package["sub.SubModel.field1"].labels == {"pydantic-field"}
+        assert package["sql.Table"].labels == {"pydantic-model"}
+        assert "pydantic-model" not in package["sub.Regular"].labels
+    if discovery == "top-down":
+        assert any("Discovered 3 models, skipped 1 other classes" in record.message for record in caplog.records)
+        assert extension.stats.discovered_models == 3
+        assert extension.stats.skipped_classes == 1
+        assert extension.stats.ancestry_checks == 0
+
+
+@pytest.mark.parametrize("cache", ["disk", "memory"])
+def test_caching_analysis_per_model_bases(tmp_path: Path, cache: str) -> None:
+    """Cached analysis results are not reused when model bases change."""
+    modules = {"__init__.py": "from ext import Wrapper\n\nclass Table(Wrapper):\n    id: int = 0\n"}
+    options: dict[str, Any] = {"cache_dir": tmp_path} if cache == "disk" else {"incremental": True}
+    for model_bases, is_model in (((), False), (("ext.Wrapper",), True)):
+        with temporary_visited_package(
+            f"bases_{cache}",
+            modules=modules,
+            extensions=Extensions(PydanticExtension(model_bases=model_bases, **options)),
+        ) as package:
+            assert ("pydantic-model" in package["Table"].labels) is is_model
+
+
+def test_invalid_discovery_mode() -> None:
+    """An invalid discovery mode is rejected."""
+    with pytest.raises(ValueError, match="Invalid discovery mode"):
+        PydanticExtension(discovery="sideways")  # ty: ignore[invalid-argument-type]
+
+
+def test_indexing_fields_and_validators() -> None:
+    """Fields and validators are indexed once, and re-indexed when indexes are invalidated."""
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension()),
+    ) as package:
+        model = package["ExampleModel"]
+        fields = model.extra["griffe_pydantic"]["fields"]
+        assert fields() is fields()
+        assert list(fields()) == [
+            "parent_field",
+            "field_without_default",
+            "field_plain_with_validator",
+            "field_with_validator_and_alias",
+            "field_with_constraints_and_description",
+        ]
+        assert list(model.extra["griffe_pydantic"]["validators"]()) == ["check_max_length_ten"]
+
+        new_field = Attribute("new_field", lineno=1, endlineno=1)
+        new_field.labels.add("pydantic-field")
+        package["ExampleParentModel"].set_member("new_field", new_field)
+        assert "new_field" not in fields()
+        common._MembersIndex.invalidate()
+        assert "new_field" in fields()
+
+        # Replacing a member keeps the number of members.
+        replacement = Attribute("replacement", lineno=1, endlineno=1)
+        replacement.labels.add("pydantic-field")
+        model.del_member("field_without_default")
+        model.set_member("replacement", replacement)
+        common._MembersIndex.invalidate()
+        assert "field_without_default" not in fields()
+        assert "replacement" in fields()
+
+        model["field_plain_with_validator"].labels.discard("pydantic-field")
+        common._MembersIndex.invalidate()
+        assert "field_plain_with_validator" not in fields()
+        replacement.labels.discard("pydantic-field")
+        replacement.labels.add("pydantic-validator")
+        common._MembersIndex.invalidate()
+        assert "replacement" not in fields()
+        assert "replacement" in model.extra["griffe_pydantic"]["validators"]()
+
+
+def test_querying_validator_graph() -> None:
+    """Validator graphs are queryable in both directions."""
+    code = """
+    from pydantic import BaseModel, field_validator
+
+    class Parent(BaseModel):
+        a: int
+        b: int
+
+    class Model(Parent):
+        c: int
+
+        @field_validator("*")
+        @classmethod
+        def all_fields(cls, v):
+            return v
+
+        @field_validator("c", "a", "c", check_fields=False)
+        @classmethod
+        def some_fields(cls, v):
+            return v
+    """
+    with temporary_visited_package(
+        "package",
+        modules={"__init__.py": code},
+        extensions=Extensions(PydanticExtension()),
+    ) as package:
+        graph = package["Model"].extra["griffe_pydantic"]["validator_graph"]
+        assert isinstance(graph, ValidatorGraph)
+        assert [field.name for field in graph.targets("all_fields")] == ["a", "b", "c"]
+        assert [field.name for field in graph.targets("some_fields")] == ["c", "a"]
+        assert [validator.name for validator in graph.field_validators("a")] == ["all_fields", "some_fields"]
+        assert graph.field_validators("b") == [package["Model.all_fields"]]
+        assert len(list(graph.edges())) == 5
+        assert package["Parent"].extra["griffe_pydantic"]["validator_graph"].validators == {}
+        assert package["Model.some_fields"].extra["griffe_pydantic"]["targets"] == graph.targets("some_fields")
+
+
+def test_collecting_stats(caplog: pytest.LogCaptureFixture) -> None:
+    """Stats are collected and optionally logged."""
+    extension = PydanticExtension(schema=True, log_stats=True)
+    with (
+        caplog.at_level(logging.INFO),
+        temporary_visited_package(
+            "package",
+            modules={"__init__.py": code},
+            extensions=Extensions(extension),
+        ) as package,
+    ):
+        package["ExampleModel"].extra["griffe_pydantic"]["schema"]()
+    stats = extension.stats
+    assert isinstance(stats, ExtensionStats)
+    assert stats.classes_scanned == 3
+    assert stats.ancestry_checks == 3
+    assert stats.models == 2
+    assert stats.fields == 5
+    assert stats.validators == 1
+    assert stats.imports == 1
+    assert stats.schemas + stats.schema_failures == 1
+    assert set(stats.timings) == {"static", "schemas"}
+    assert any("Stats after package package: 3 classes scanned" in record.message for record in caplog.records)
+
+
+def test_processing_models_as_soon_as_they_are_inspected() -> None:
+    """Models are processed during inspection, or at the end when their ancestors are not loaded yet."""
+    labeled: dict[str, bool] = {}
+
+    class _Recorder(Extension):
+        def on_class_members(self, *, cls: Class, **kwargs: Any) -> None:  # noqa: ARG002
+            labeled[cls.path] = "pydantic-model" in cls.labels
+
+    modules = {
+        "__init__.py": "",
+        "a.py": "from streaming.z import Parent\n\nclass Child(Parent):\n    child_field: int = 0\n",
+        "z.py": "from pydantic import BaseModel\n\nclass Parent(BaseModel):\n    parent_field: int = 0\n",
+    }
+    extension = PydanticExtension()
+    with temporary_inspected_package(
+        "streaming",
+        modules=modules,
+        extensions=Extensions(extension, _Recorder()),
+        search_sys_path=True,
+    ) as package:
+        assert labeled == {"streaming.a.Child": False, "streaming.z.Parent": True}
+        assert "pydantic-model" in package["a.Child"].labels
+        assert not extension._states[package.modules_collection].deferred
+
+
+def test_inspecting_frozen_models() -> None:
+    """Members of inspected models that cannot be resolved (like the hash function of frozen models) are ignored."""
+    with temporary_inspected_package(
+        "frozen",
+        modules={
+            "__init__.py": "from pydantic import BaseModel, ConfigDict\n\n"
+            "class Frozen(BaseModel):\n    model_config = ConfigDict(frozen=True)\n    a: int = 0\n",
+        },
+        extensions=Extensions(PydanticExtension()),
+        search_sys_path=True,
+    ) as package:
+        assert "pydantic-model" in package["Frozen"].labels
+        assert isinstance(package["Frozen"].extra["griffe_pydantic"]["validator_graph"], ValidatorGraph)
+
+
+@pytest.mark.parametrize("discovery", ["bottom-up", "top-down"])
+def test_detecting_models_whose_bases_are_loaded_later(tmp_path: Path, discovery: str) -> None:
+    """Classes are detected as models once the packages declaring their bases are loaded."""
+    sources = {
+        "pa": "import pb\n\nclass C(pb.X):\n    c: int = 0\n",
+        "pb": "from pydantic import BaseModel\n\nclass X(BaseModel):\n    x: int = 0\n",
+        "pc": "import pa\n\nclass D(pa.C):\n    d: int = 0\n",
+    }
+    for name, source in sources.items():
+        tmp_path.joinpath(name).mkdir()
+        tmp_path.joinpath(name, "__init__.py").write_text(source)
+    extension = PydanticExtension(discovery=discovery)  # ty: ignore[invalid-argument-type]
+    loader = GriffeLoader(extensions=Extensions(extension), search_paths=[tmp_path])
+    packages = {name: loader.load(name) for name in sources}
+    assert "pydantic-model" not in packages["pa"]["C"].labels
+    assert "pydantic-model" in packages["pb"]["X"].labels
+    assert "pydantic-model" in packages["pc"]["D"].labels
+    if discovery == "top-down":
+        assert extension.stats.discovered_models == 2
+        assert extension.stats.skipped_classes == 1
+        assert extension.stats.classes_scanned == 2
+
+
+def test_deprecated_class_instance_hook() -> None:
+    """Calling the former `on_class_instance` hook directly warns, and processes the model."""
+    modules = {"__init__.py": "from pydantic import BaseModel\n\nclass Model(BaseModel):\n    a: int = 0\n"}
+    with temporary_inspected_package("deprecated_hook", modules=modules, search_sys_path=True) as package:
+        node = ObjectNode(sys.modules["deprecated_hook"].Model, "Model")
+        with pytest.deprecated_call():
+            PydanticExtension().on_class_instance(node=node, cls=package["Model"])
+        assert "pydantic-model" in package["Model"].labels
+
+
+def test_releasing_state_along_with_loaders() -> None:
+    """State is kept per loader, and released along with it."""
+    extension = PydanticExtension()
+    for _ in range(3):
+        with temporary_visited_package(
+            "package",
+            modules={"__init__.py": code},
+            extensions=Extensions(extension),
+        ) as package:
+            state = extension._states[package.modules_collection]
+            assert "package.ExampleModel" in state.processed
+            assert state.package is None
+        del package, state
+        # Finalizers can run while the lock is held by the same thread.
+        with extension._lock:
+            gc.collect()
+        assert not extension._states
+    assert extension.stats.models == 6
+
+
+def test_sharing_extension_across_threads() -> None:
+    """One extension can be used by several loaders concurrently."""
+    extension = PydanticExtension()
+
+    def _load(index: int) -> bool:
+        with temporary_visited_package(
+            f"package{index}",
+            modules={"__init__.py": code},
+            extensions=Extensions(extension),
+        ) as package:
+            return (
+                package["ExampleModel"].labels == {"pydantic-model"}
+                and len(
+                    package["ExampleModel"].extra["griffe_pydantic"]["fields"](),
+                )
+                == 5
+            )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert all(executor.map(_load, range(8)))
+    assert extension.stats.models == 16
+
+
+def test_analyzing_members_in_threads(tmp_path: Path) -> None:
+    """Analyzing members in threads gives the same results as analyzing them serially."""
+    base = "from pydantic import BaseModel, Field\n\nclass Base(BaseModel):\n    base_field: int = Field(0, ge=0)\n"
+    model = code.replace(
+        "class ExampleParentModel(BaseModel)",
+        "from package import Base\n\n    class ExampleParentModel(Base)",
+    )
+    modules = {"__init__.py": base, **{f"models{index}.py": model for index in range(4)}}
+
+    def _load(threads: int, cache_dir: Path | None = None) -> tuple[dict, dict]:
+        extension = PydanticExtension(threads=threads, cache_dir=cache_dir)
+        with temporary_visited_package(
+            "package",
+            modules=modules,
+            extensions=Extensions(extension),
+        ) as package:
+            results = {path: serialization._dump_module(module) for path, module in package.modules.items()}
+            results["package"] = serialization._dump_module(package)
+        stats = extension.stats
+        stats.timings = {}
+        return results, vars(stats)
+
+    serial = _load(0)
+    assert serial[1]["fields"] == 21
+    assert _load(4) == serial
+    # Partially cached: cached results must not be overwritten by pending analyses.
+    _load(0, tmp_path)
+    tmp_path.joinpath("analysis", "package.json").unlink()
+    assert _load(4, tmp_path)[0] == serial[0]
+
+
+def test_flushing_parallel_runs_once_with_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """With a cache, cached analyses are applied first, and the other modules are analyzed in one flush."""
+    modules = {"__init__.py": "", **{f"models{index}.py": code for index in range(8)}}
+    flushes: list[int] = []
+    flush = static._ParallelRun.flush
+
+    def _flush(self: static._ParallelRun) -> None:
+        flushes.append(len(self._batches))
+        flush(self)
+
+    monkeypatch.setattr(static._ParallelRun, "flush", _flush)
+    for index in (0, 1):
+        if index:
+            tmp_path.joinpath("analysis", "package.models3.json").unlink()
+            tmp_path.joinpath("analysis", "package.models5.json").unlink()
+        with temporary_visited_package(
+            "package",
+            modules=modules,
+            extensions=Extensions(PydanticExtension(threads=4, cache_dir=tmp_path)),
+        ) as package:
+            assert "pydantic-model" in package["models5.ExampleModel"].labels
+    assert flushes == [8, 2]
+
+
+def test_skipping_modules_that_cannot_declare_models() -> None:
+    """Modules not importing models, directly or not, are skipped."""
+    modules = {
+        "__init__.py": "",
+        "base.py": "import pydantic\n\nclass Base(pydantic.BaseModel):\n    a: int = 0\n",
+        "reexport.py": "from package.base import *\n",
+        "uses_reexport.py": "from package import reexport\n\nclass Model(reexport.Base):\n    b: int = 0\n",
+        "uses_package.py": "import package\n\nclass Model(package.base.Base):\n    c: int = 0\n",
+        "unrelated.py": "from pydantic import Field\nfrom os import path\n\nclass Regular:\n    d: int = 0\n",
+        "other.py": "from package.unrelated import Regular\n\nclass Other(Regular):\n    e: int = 0\n",
+    }
+    extension = PydanticExtension(prefilter=True)
+    with temporary_visited_package("package", modules=modules, extensions=Extensions(extension)) as package:
+        for path in ("base.Base", "uses_reexport.Model", "uses_package.Model"):
+            assert "pydantic-model" in package[path].labels
+    # The (empty) package, `unrelated` and `other` are skipped.
+    assert extension.stats.skipped_modules == 3
+    assert extension.stats.classes_scanned == 3
+
+
+def test_preimporting_modules(caplog: pytest.LogCaptureFixture) -> None:
+    """Modules are imported in the background, and import failures are reported once."""
+    extension = PydanticExtension(preimport=["json", "griffe_pydantic_missing_module"])
+    with caplog.at_level(logging.WARNING):
+        for _ in range(2):
+            with temporary_inspected_package(
+                "preimport",
+                modules={"__init__.py": code},
+                extensions=Extensions(extension),
+                search_sys_path=True,
+            ) as package:
+                assert "pydantic-model" in package["ExampleModel"].labels
+    assert extension._preimport_thread is None
+    messages = [record.message for record in caplog.records if "pre-import" in record.message]
+    assert len(messages) == 1
+    assert "Could not pre-import griffe_pydantic_missing_module: ModuleNotFoundError" in messages[0]